@@ -0,0 +1,78 @@
+"""Author: Dr. Joshua Thomas
+thomas.joshd@gmail.com
+thomasjd@alfred.edu
+
+The 24 hour display has black numbers on the outside for local time.
+
+The blue numbers on the inner ring change on their own so that the meridian
+(indicated by the hour hand) is pointing to both the current right ascension of
+the meridian (local sidereal time) and the local civil time.
+
+The purple and blue hour hands always move together and is color coordinated
+with the digital displays at the bottom.
+
+The red hour hand indicates the UT time on the black ring of numbers, and
+corresponds to the red UT digital display.
+
+The thin gray lines perpendicular to the purple/blue hour hands indicates 6
+hours of hour angle, approximately the horizon at the celestial equator.
+
+The planets are indicated by their astronomical symbols, they are approximately
+color coded red for Mars, Jupiter and Saturn are the same color as "giant"
+planets and Neptune and Uranus are blue for "ice giants". Their location is
+their right ascension, so it can be read from the blue set of numbers of the
+dial.  Their distances from the center (earth) follow a geocentric-type
+approach, the distances are not scaled and are set a fixed values that looked
+nice. Venus and Mercury are black when inferior to the sun, and red when
+superior to the sun.
+
+The sunset/sunrise times are color coordinated with marks on the dial and the
+nighttime hours are shaded.
+
+The moon phase can be inferred from the relative position of the Sun, Earth, and
+ Moon.  The Earth is at the center of the dial.  Since this is a clock, the
+ moon moves clockwise in right ascension. To aid in interpreting phase 1st and
+ 3rd quarters are marked, new moon is of course when the moon is between the
+ sun and earth.
+
+
+"""
+
+UPDATED="06-AUG-2025"
+version="0.9"
+
+#The clock's astronomy as a library: no Tk, no window.  Import what you need,
+#    from observatory_clock import SiteContext, compute_clock_state
+#    site=SiteContext("Stull Observatory",42.249999,-77.783302)
+#    state=compute_clock_state(site)
+#The GUI is started with python -m observatory_clock.
+#
+#Nothing is imported until it is used: astropy, astroplan and suntime take
+#seconds to load on a small computer and the GUI shows its face before them.
+_exports={
+    "DEFAULTS":"prefs","readprefs":"prefs","PrefsWatcher":"prefs",
+    "BODIES":"constants",
+    "fast_sidereal":"sidereal","split_hours":"sidereal","validate_sidereal":"sidereal",
+    "BodyPositions":"ephemeris","Ephemeris":"ephemeris","EphemerisTable":"ephemeris",
+    "RiseSet":"clockstate","RiseSetCache":"site","SiteContext":"site",
+    "ClockState":"clockstate","compute_clock_state":"state",
+    "Sweep":"sweep","sweep":"sweep","time_range":"sweep",
+    "Catalog":"catalog","readcatalog":"catalog",
+    "EventEngine":"events",
+    "ClockWorker":"worker","ChangeClock":"lowpower",
+    "ClockServer":"server","ClockClient":"client",
+    "ClockFace":"face",
+    "DisplayList":"render","render_svg":"render","render_png":"render","render_file":"render",
+    }
+__all__=sorted(_exports)
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    from importlib import import_module
+    value=getattr(import_module("."+_exports[name],__name__),name)
+    globals()[name]=value
+    return value
+
+def __dir__():
+    return sorted(list(globals())+__all__)
@@ -0,0 +1,61 @@
+#python -m observatory_clock starts the clock window, --render draws it to a file
+#instead and --serve serves it to other displays
+import argparse
+from .prefs import PREFS_FILE, load, flatten, readsites
+from . import data
+
+def render_main(filename,width=None,prefs=None):
+    #headless: one frame of the clock for the saved site, no Tk window needed
+    from .site import SiteContext
+    from .state import compute_clock_state
+    from .render import render_file
+    data.use_cache()
+    prefs=prefs or flatten(load())
+    site=SiteContext(prefs["sitename"],prefs["latf"],prefs["lonf"],prefs["elevation"],prefs["tz"])
+    state=compute_clock_state(site,sidereal_mode=prefs["sidereal_mode"])
+    render_file(state,filename,width or prefs["render_size"] or prefs["WIDTH"],fontsize=prefs["fontsize"])
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="24 hour observatory clock")
+    parser.add_argument("--render",metavar="FILE",help="write the clock face to FILE (.svg, or .png with Pillow) without opening a window")
+    parser.add_argument("--size",type=int,help="clock size in pixels for --render, default is render_size or the clock size from the preferences")
+    parser.add_argument("--sites",metavar="FILE",help="show a clock for each site in FILE, one per line: name, latitude, longitude[, timezone]")
+    parser.add_argument("--dashboard",action="store_true",help="show a clock for every site in the preferences")
+    parser.add_argument("--prefs",metavar="FILE",default=PREFS_FILE,help="the preferences file, default %s"%PREFS_FILE)
+    parser.add_argument("--serve",action="store_true",help="compute the clock for the preferences' site and serve it as JSON over HTTP and WebSocket for other displays, without a window")
+    parser.add_argument("--host",default="127.0.0.1",help="address --serve listens on, 0.0.0.0 for the whole network, default 127.0.0.1")
+    parser.add_argument("--port",type=int,default=8765,help="port --serve listens on, default 8765")
+    parser.add_argument("--connect",metavar="HOST:PORT",help="show the clock served by --serve at HOST:PORT instead of computing it")
+    parser.add_argument("--metrics",metavar="FILE",help="append tick timings, drift and memory to FILE as JSON lines every minute, press i in the window for the same as an overlay")
+    parser.add_argument("--prefetch",action="store_true",help="download the IERS, leap second and (with --ephemeris) JPL ephemeris data for offline use, then exit")
+    parser.add_argument("--cache-dir",help="where the downloaded data is kept, default %s"%data.CACHE_DIR)
+    parser.add_argument("--offline",action="store_true",help="never use the network, only the cached or bundled data")
+    parser.add_argument("--ephemeris",help="a prefetched JPL ephemeris such as de440s instead of the built in one, default is the one in the preferences")
+    args=parser.parse_args(argv)
+    prefs=load(args.prefs)
+    ephemeris=args.ephemeris or prefs["ephemeris"]
+    data.configure(args.cache_dir,args.offline,ephemeris)
+
+    if args.prefetch:
+        if not data.prefetch(args.cache_dir,ephemeris):
+            raise SystemExit(1)
+    elif args.render:
+        render_main(args.render,args.size,flatten(prefs))
+    elif args.serve:
+        from .site import SiteContext
+        from .server import serve
+        flat=flatten(prefs)
+        site=SiteContext(flat["sitename"],flat["latf"],flat["lonf"],flat["elevation"],flat["tz"])
+        serve(site,args.host,args.port,flat["refresh"],flat["sidereal_mode"])
+    else:
+        from .gui import run
+        if args.sites:
+            sites=readsites(args.sites)
+        elif args.dashboard:
+            sites=prefs["sites"]
+        else:
+            sites=None
+        run(args.metrics,sites,args.prefs,args.connect)
+
+if __name__ == "__main__":
+    main()
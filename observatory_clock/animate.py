@@ -0,0 +1,71 @@
+#Smooth animation of the dial between the worker's ClockStates.  The worker
+#computes a state once a second (the bodies every 20 s); a frame is the newest
+#state moved on to the moment it is drawn with plain arithmetic: the clocks
+#run on, sidereal time runs 1.0027 times faster and each body carries on along
+#its motion between the last two ephemerides.  Nothing here uses astropy, so
+#a frame costs about as much as drawing it.
+from time import time
+from datetime import timedelta
+from .constants import pi12, pi2, BODIES
+from .sidereal import split_hours
+
+SIDEREAL_RATE=1.00273790935 #sidereal seconds per UT second
+UNIX_JD=2440587.5 #JD of the unix epoch
+MAX_AHEAD=5 #seconds a state is moved on at most, if the worker stops so does the dial
+MAX_RATE=20 #degrees of RA a day, faster than the moon ever moves is a new site, not motion
+
+def hours(hms):
+    return hms[0]+hms[1]/60.+hms[2]/3600.
+
+class Animator:
+    #Holds the newest ClockState from the worker (push) and makes the state
+    #for a moment shortly after it (frame).
+    def __init__(self):
+        self.state=None
+        self.stamp=None #unix time of state
+        self.eph=None #the ephemeris the body positions are moved on from
+        self.eph_jd=None #and the JD it was computed for
+        self.rates={} #body -> degrees of RA a day
+
+    def push(self,state):
+        if self.state is not None and state.sitename != self.state.sitename:
+            self.eph=None #the topocentric moon jumps, not a motion to follow
+            self.rates={}
+        if state.eph is not self.eph:
+            if self.eph is not None and state.jd > self.eph_jd:
+                days=state.jd-self.eph_jd
+                self.rates={}
+                for body in BODIES:
+                    rate=((state.eph[body][0]-self.eph[body][0]+180)%360-180)/days
+                    self.rates[body]=rate if abs(rate) < MAX_RATE else 0.0
+            self.eph=state.eph
+            self.eph_jd=state.jd
+        self.state=state
+        self.stamp=(state.jd-UNIX_JD)*86400
+
+    def frame(self,now=None):
+        #the state at unix time now (default the system clock), None before the first push
+        if self.state is None:
+            return None
+        if now is None:
+            now=time()
+        return self.advance(min(max(now-self.stamp,0),MAX_AHEAD))
+
+    def advance(self,seconds):
+        #the newest state moved on by seconds, the same fields make_state gives
+        state=self.state
+        local=state.local+timedelta(seconds=seconds)
+        jd=state.jd+seconds/86400.
+        gast=(hours(state.gast)+seconds*SIDEREAL_RATE/3600.)%24
+        last=(hours(state.last)+seconds*SIDEREAL_RATE/3600.)%24
+        LAST=split_hours(last)
+        stdelta=local.hour+local.minute/60.+(local.second+local.microsecond/1e6)/3600.-last
+        stangle=(LAST[0]+LAST[1]/60.)*pi12-pi2+stdelta*pi12
+        days=jd-self.eph_jd
+        eph={}
+        for body in BODIES:
+            ra,dec,distance=self.eph[body]
+            eph[body]=((ra+self.rates.get(body,0.0)*days)%360,dec,distance)
+        return state._replace(local=local,jd=jd,mjd=state.mjd+seconds/86400.,
+                              ut_hour=float(int((jd+0.5)%1*24)),gast=split_hours(gast),last=LAST,
+                              stdelta=stdelta,stangle=stangle,eph=eph)
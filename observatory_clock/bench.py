@@ -0,0 +1,424 @@
+#Benchmarks for the clock, run with python -m observatory_clock.bench
+import os
+import sys
+import json
+import argparse
+import subprocess
+from time import perf_counter, sleep
+from datetime import datetime,timezone
+
+#Cold start in a fresh interpreter, the way a kiosk starts the clock.  "face" is
+#everything the window needs before it can show the static face, "imports" is
+#the astronomy stack loaded in the background and "first_state" is the site
+#and the first ClockState drawn onto the face.  lazy checks that the face
+#stage did not pull in astropy.
+_STARTUP='''
+import sys,time,json
+t0=time.perf_counter()
+import observatory_clock.gui
+from observatory_clock.face import ClockFace
+face=ClockFace()
+t1=time.perf_counter()
+lazy="astropy" not in sys.modules
+from observatory_clock.site import SiteContext
+from observatory_clock.state import compute_clock_state
+from observatory_clock import data
+data.use_cache()
+t2=time.perf_counter()
+state=compute_clock_state(SiteContext("bench",42.249999,-77.783302))
+face.update(state)
+t3=time.perf_counter()
+print(json.dumps({"face":t1-t0,"imports":t2-t1,"first_state":t3-t2,"total":t3-t0,"lazy":lazy}))
+'''
+STARTUP_STAGES=("face","imports","first_state","total")
+
+#the most the soak may grow after its warmup: resident and traced memory in
+#MB, canvas items and the newest item id (no items should be made once the
+#face has everything), threads (the table builds come and go)
+SOAK_LIMITS={"rss":20.,"traced":5.,"items":0,"newest":0,"threads":2}
+
+def bench_startup(n=5):
+    #run the cold start n times, returns the list of per-run stage times in seconds
+    env=dict(os.environ)
+    root=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"]=root+os.pathsep+env.get("PYTHONPATH","")
+    runs=[]
+    for i in range(n):
+        out=subprocess.run([sys.executable,"-c",_STARTUP],env=env,capture_output=True,text=True,check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return runs
+
+def summarize(samples):
+    #percentiles of a list of times in seconds
+    times=sorted(samples)
+    def pct(p):
+        return times[min(len(times)-1,int(round(p/100.*(len(times)-1))))]
+    return {"n":len(times),"mean":sum(times)/len(times),"p50":pct(50),"p90":pct(90),
+            "p99":pct(99),"max":times[-1]}
+
+def report(title,stages,scale=1000.,unit="ms"):
+    print("%s (%s)"%(title,unit))
+    print("%-24s %6s %9s %9s %9s %9s %9s"%("stage","n","mean","p50","p90","p99","max"))
+    for stage,st in stages.items():
+        print("%-24s %6d %9.3f %9.3f %9.3f %9.3f %9.3f"%(stage,st["n"],st["mean"]*scale,st["p50"]*scale,
+              st["p90"]*scale,st["p99"]*scale,st["max"]*scale))
+
+def report_startup(runs):
+    report("startup, %d cold runs"%len(runs),{stage:summarize([r[stage] for r in runs]) for stage in STARTUP_STAGES},1.,"s")
+    if not all(r["lazy"] for r in runs):
+        print("WARNING: astropy was imported before the face was drawn")
+
+class HeadlessCanvas:
+    #Stands in for a tk.Canvas when there is no display, so the renderer's own
+    #work is still timed.  It only keeps the items, Tk's drawing is not included.
+    def __init__(self):
+        self.items={}
+        self.next=1
+
+    def create(self,*coords,**options):
+        self.items[self.next]=(coords,options)
+        self.next+=1
+        return self.next-1
+    create_line=create_text=create_oval=create_arc=create
+
+    def coords(self,id,*coords):
+        self.items[id]=(coords,self.items[id][1])
+
+    def itemconfig(self,id,**options):
+        self.items[id][1].update(options)
+
+    def delete(self,tag):
+        self.items.clear()
+
+    def find_all(self):
+        return tuple(self.items)
+
+def make_canvas(width):
+    #a real Tk canvas if there is a display, otherwise the headless stand in
+    try:
+        import tkinter as tk
+        root=tk.Tk()
+        root.withdraw()
+        return tk.Canvas(root,width=width,height=width),"tk"
+    except Exception:
+        return HeadlessCanvas(),"headless"
+
+def timed(func,n,budget):
+    #call func up to n times or until budget seconds are used, at least 3 times
+    samples=[]
+    start=perf_counter()
+    while len(samples) < n and (len(samples) < 3 or perf_counter()-start < budget):
+        t=perf_counter()
+        func()
+        samples.append(perf_counter()-t)
+    return samples
+
+def bench_tick(n=200,budget=2.0):
+    #Each stage of a clock tick on its own, n times or for budget seconds.
+    #get_body:* is the old serial path, one astropy get_body per body, to
+    #compare with the batched Ephemeris and the interpolated table.  The canvas
+    #is synced retained (only changed items) and as a full redraw (delete and
+    #create everything, like the clock used to) from states a minute apart.
+    #animation_frame is one frame of the smooth animation: the state moved on
+    #without astropy, drawn and synced.
+    from . import data
+    data.use_cache()
+    import astropy.units as u
+    from astropy.time import Time
+    from astropy.coordinates import get_body
+    from .prefs import readprefs
+    from .constants import BODIES
+    from .site import SiteContext
+    from .ephemeris import Ephemeris, EphemerisTable
+    from .state import sidereal_times, get_dut1, compute_clock_state
+    from .worker import ClockWorker
+    from .face import ClockFace
+    from .render import TkRenderer
+    from .animate import Animator
+
+    prefs=readprefs()
+    site=SiteContext(prefs["sitename"],prefs["latf"],prefs["lonf"])
+    ut=site.time(Time.now())
+    dut1=get_dut1(ut)
+    local=ut.to_datetime()
+    ephemeris=Ephemeris()
+    table=EphemerisTable(ephemeris)
+    table.build(ut-6*u.hour,site.location)
+    worker=ClockWorker(site)
+    worker.compute() #warm the caches, like a running clock
+    while worker.ephtable.building: #its table is built in a thread, let it finish first
+        sleep(0.1)
+    states=[compute_clock_state(site,ut+i*u.min,ephemeris) for i in range(20)]
+    face=ClockFace(prefs["WIDTH"],fontsize=prefs["fontsize"])
+    canvas,kind=make_canvas(prefs["WIDTH"])
+    renderer=TkRenderer(canvas)
+    renderer.sync(face.display)
+
+    stages={}
+    def stage(name,func):
+        stages[name]=summarize(timed(func,n,budget))
+
+    stage("time",lambda: site.time(Time.now()))
+    stage("moon_illumination",lambda: site.moon_illumination(ut))
+    stage("riseset",lambda: site.sun.compute(site.latf,site.lonf,local.date()))
+    stage("riseset_cached",lambda: site.riseset(local.date()))
+    stage("sidereal_fast",lambda: sidereal_times(site,ut,"fast",dut1))
+    stage("sidereal_gast_astropy",lambda: ut.sidereal_time('apparent','greenwich'))
+    stage("sidereal_last_astropy",lambda: ut.sidereal_time('apparent'))
+    for body in BODIES:
+        stage("get_body:"+body,lambda body=body: get_body(body,ut,site.location))
+    stage("bodies_batched",lambda: ephemeris.compute(ut))
+    stage("bodies_table",lambda: table.interpolate(ut))
+    count=[0]
+    def next_state():
+        count[0]+=1
+        return states[count[0]%len(states)]
+    stage("face_update",lambda: face.update(next_state()))
+    def retained():
+        face.update(next_state())
+        t=perf_counter()
+        renderer.sync(face.display)
+        return perf_counter()-t
+    def full():
+        face.update(next_state())
+        t=perf_counter()
+        canvas.delete("all")
+        face.display.changed.update(face.display.items)
+        TkRenderer(canvas).sync(face.display)
+        return perf_counter()-t
+    #the face update is not part of the canvas time
+    stages["canvas_retained"]=summarize([retained() for i in range(min(n,500))])
+    stages["canvas_full"]=summarize([full() for i in range(min(n,500))])
+    animator=Animator()
+    animator.push(states[0])
+    animator.push(states[1])
+    smooth=ClockFace(prefs["WIDTH"],fontsize=prefs["fontsize"],smooth=True)
+    smooth_renderer=TkRenderer(make_canvas(prefs["WIDTH"])[0])
+    def frame():
+        count[0]+=1
+        smooth.update(animator.advance(count[0]%1000*0.05))
+        smooth_renderer.sync(smooth.display)
+    stage("animation_frame",frame)
+    stage("tick_total",lambda: worker.compute())
+
+    serial=sum(stages["get_body:"+b]["p50"] for b in BODIES)
+    compare={
+        "bodies_serial_p50":serial,
+        "bodies_batched_speedup":serial/stages["bodies_batched"]["p50"],
+        "bodies_table_speedup":serial/stages["bodies_table"]["p50"],
+        "sidereal_fast_speedup":(stages["sidereal_gast_astropy"]["p50"]+stages["sidereal_last_astropy"]["p50"])
+                                /stages["sidereal_fast"]["p50"],
+        "canvas_retained_speedup":stages["canvas_full"]["p50"]/stages["canvas_retained"]["p50"],
+        }
+    return {"stages":stages,"compare":compare,"canvas":kind}
+
+def report_tick(result):
+    report("tick stages, %s canvas"%result["canvas"],result["stages"])
+    c=result["compare"]
+    print("bodies: serial get_body %0.2f ms, batched %0.1fx faster, table %0.0fx faster"
+          %(c["bodies_serial_p50"]*1000,c["bodies_batched_speedup"],c["bodies_table_speedup"]))
+    print("sidereal: fast path %0.0fx faster than astropy"%c["sidereal_fast_speedup"])
+    print("canvas: retained %0.1fx faster than a full redraw"%c["canvas_retained_speedup"])
+
+def bench_sidereal(n=5000,start="1995-01-01",years=30):
+    #The clock's closed form sidereal time against astropy's apparent
+    #sidereal time over years, offline with the cached or bundled IERS data.
+    #failed says so when the worst difference is over SIDEREAL_TOLERANCE.
+    from . import data
+    data.use_cache()
+    from .sidereal import validate_sidereal, SIDEREAL_TOLERANCE
+    worst,ok=validate_sidereal(n,start,years)
+    return {"n":n,"start":start,"years":years,"worst":float(worst),"tolerance":SIDEREAL_TOLERANCE,
+            "failed":[] if ok else ["worst difference %0.4f s, more than %g s"%(worst,SIDEREAL_TOLERANCE)]}
+
+def report_sidereal(result):
+    print("sidereal: fast path against astropy at %d times over %g years from %s, worst %0.4f s (tolerance %g s)"
+          %(result["n"],result["years"],result["start"],result["worst"],result["tolerance"]))
+    for reason in result["failed"]:
+        print("FAILED: %s"%reason)
+    if not result["failed"]:
+        print("passed")
+
+def soak_clock(clock):
+    #(worker, tick, canvas) for the soak: tick() has the worker work out the
+    #state at clock() and draws it.  With a display it is the clock window,
+    #App.time_update showing the worker's newest state; the after it leaves
+    #for the next second is cancelled, the ticks run back to back.  Without
+    #one the face is drawn onto the stand in canvas.
+    from .worker import ClockWorker
+    try:
+        import tkinter as tk
+        root=tk.Tk()
+    except Exception:
+        root=None
+    if root is not None:
+        from .gui import App
+        app=App(root)
+        while app.worker is None: #its own worker, on the system clock
+            sleep(0.1)
+        app.worker.stop()
+        worker=ClockWorker(app.site,app.refresh,app.sidereal_mode,app.metrics,clock)
+        app.worker=worker
+        def tick():
+            worker.latest=worker.compute()
+            app.time_update()
+            for job in root.tk.splitlist(root.tk.call("after","info")):
+                root.after_cancel(job)
+            root.update_idletasks()
+        return worker,tick,app.canvas,"tk"
+    from .prefs import readprefs
+    from .site import SiteContext
+    from .face import ClockFace
+    from .render import TkRenderer
+    prefs=readprefs()
+    worker=ClockWorker(SiteContext(prefs["sitename"],prefs["latf"],prefs["lonf"],prefs["elevation"],prefs["tz"]),
+                       prefs["refresh"],prefs["sidereal_mode"],clock=clock)
+    face=ClockFace(prefs["WIDTH"],fontsize=prefs["fontsize"])
+    canvas=HeadlessCanvas()
+    renderer=TkRenderer(canvas)
+    def tick():
+        face.update(worker.compute())
+        renderer.sync(face.display)
+    return worker,tick,canvas,"headless"
+
+def soak_sample(day,canvas,ticks,trace):
+    #the memory, items and threads now, and the tick times since the last sample
+    import gc
+    import threading
+    import tracemalloc
+    from .metrics import memory_mb
+    items=canvas.find_all()
+    sample={"day":day,"rss":memory_mb(),"traced":tracemalloc.get_traced_memory()[0]/1048576. if trace else None,
+            "objects":len(gc.get_objects()),"threads":threading.active_count(),
+            "items":len(items),"newest":max(items) if items else 0}
+    sample.update({key:value*1000 for key,value in summarize(ticks).items() if key != "n"} if ticks else {})
+    return sample
+
+def bench_soak(days=1.,step=10.,every=1.,warmup=1.,trace=True,limits=None):
+    #Runs the clock through days of simulated time as fast as it goes, a tick
+    #every step simulated seconds, and samples every simulated hours: the
+    #resident memory, the memory Python allocated (tracemalloc, when trace),
+    #live objects and threads, the canvas items and the newest item id (which
+    #only grows if items are made again), and the tick times.  Growth is from
+    #the end of the warmup hours, when every cache and the ephemeris table are
+    #full, to the end; failed lists what grew more than limits allows.
+    import tracemalloc
+    from . import data
+    data.use_cache()
+    limits=dict(SOAK_LIMITS,**(limits or {}))
+    if trace:
+        tracemalloc.start()
+    now=[datetime.now(timezone.utc).timestamp()]
+    worker,tick,canvas,kind=soak_clock(lambda: now[0])
+    ticks=int(days*86400/step)
+    start=perf_counter()
+    samples=[]
+    times=[]
+    baseline=None
+    for i in range(1,ticks+1):
+        now[0]+=step
+        t=perf_counter()
+        tick()
+        times.append(perf_counter()-t)
+        day=i*step/86400.
+        if i == ticks or int(i*step/(every*3600)) != int((i-1)*step/(every*3600)):
+            samples.append(soak_sample(day,canvas,times,trace))
+            times=[]
+            if baseline is None and day*24 >= warmup:
+                baseline=samples[-1]
+                snapshot=tracemalloc.take_snapshot() if trace else None
+    seconds=perf_counter()-start
+    worker.stop()
+    last=samples[-1]
+    baseline=baseline or samples[0]
+    growth={key:last[key]-baseline[key] for key in ("rss","traced","objects","threads","items","newest")
+            if last[key] is not None and baseline[key] is not None}
+    top=[]
+    if trace:
+        ignore=[tracemalloc.Filter(False,tracemalloc.__file__),tracemalloc.Filter(False,"<frozen importlib._bootstrap*>")]
+        diff=tracemalloc.take_snapshot().filter_traces(ignore).compare_to(snapshot.filter_traces(ignore),"lineno")
+        top=[{"where":"%s:%d"%(stat.traceback[0].filename,stat.traceback[0].lineno),"kb":stat.size_diff/1024.,
+              "count":stat.count_diff} for stat in diff[:10] if stat.size_diff > 0]
+        tracemalloc.stop()
+    failed=["%s grew by %g, more than %g"%(key,round(growth[key],2),limit) for key,limit in limits.items()
+            if key in growth and growth[key] > limit]
+    return {"days":days,"step":step,"ticks":ticks,"canvas":kind,"seconds":seconds,"samples":samples,
+            "warmup_day":baseline["day"],"growth":growth,"limits":limits,"top":top,"failed":failed}
+
+def report_soak(result):
+    print("soak, %g simulated days in %d ticks of %g s on a %s canvas, %0.1f s (%0.0fx real time)"
+          %(result["days"],result["ticks"],result["step"],result["canvas"],result["seconds"],
+            result["days"]*86400/result["seconds"]))
+    print("%7s %8s %9s %8s %7s %6s %9s %9s %9s %9s"%("day","rss MB","traced MB","objects","threads","items",
+                                                      "newest id","p50 ms","p99 ms","max ms"))
+    na=lambda value,format: "-" if value is None else format%value
+    for s in result["samples"]:
+        print("%7.3f %8s %9s %8d %7d %6d %9d %9s %9s %9s"%(s["day"],na(s["rss"],"%0.1f"),na(s["traced"],"%0.2f"),
+              s["objects"],s["threads"],s["items"],s["newest"],na(s.get("p50"),"%0.2f"),na(s.get("p99"),"%0.2f"),
+              na(s.get("max"),"%0.2f")))
+    days=result["days"]-result["warmup_day"]
+    print("growth after the warmup (day %0.3f):"%result["warmup_day"])
+    for key,value in result["growth"].items():
+        limit=result["limits"].get(key)
+        print("  %-8s %+10.2f %s%s"%(key,value,"(%+0.2f a day)"%(value/days) if days > 0 else "",
+                                     ", limit %g"%limit if limit is not None else ""))
+    if result["top"]:
+        print("most grown allocations (KB, blocks):")
+        for stat in result["top"]:
+            print("  %+9.1f %+7d  %s"%(stat["kb"],stat["count"],stat["where"]))
+    for reason in result["failed"]:
+        print("FAILED: %s"%reason)
+    if not result["failed"]:
+        print("passed")
+
+def write_json(filename,bench,result):
+    #results with enough context to compare between releases and computers
+    import platform
+    from . import version
+    out={"bench":bench,"version":version,"python":platform.python_version(),
+         "machine":platform.machine(),"time":datetime.now(timezone.utc).isoformat(),"result":result}
+    try:
+        import astropy
+        out["astropy"]=astropy.__version__
+    except ImportError:
+        pass
+    if filename == "-":
+        print(json.dumps(out,indent=1))
+    else:
+        with open(filename,"w") as f:
+            json.dump(out,f,indent=1)
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="observatory clock benchmarks")
+    parser.add_argument("bench",choices=["startup","tick","soak","sidereal"],help="which benchmark to run")
+    parser.add_argument("-n",type=int,help="number of runs, default 5 for startup and 200 for tick, times compared for sidereal, default 5000")
+    parser.add_argument("--budget",type=float,default=2.0,help="most seconds to spend on one tick stage")
+    parser.add_argument("--days",type=float,default=1.,help="simulated days the soak runs, default 1")
+    parser.add_argument("--step",type=float,default=10.,help="simulated seconds a soak tick, default 10")
+    parser.add_argument("--every",type=float,default=1.,help="simulated hours between soak samples, default 1")
+    parser.add_argument("--max-rss",type=float,default=SOAK_LIMITS["rss"],help="MB the resident memory may grow in the soak, default %(default)s")
+    parser.add_argument("--max-traced",type=float,default=SOAK_LIMITS["traced"],help="MB the Python allocations may grow in the soak, default %(default)s")
+    parser.add_argument("--max-items",type=int,default=SOAK_LIMITS["items"],help="canvas items (and new item ids) the soak may add, default %(default)s")
+    parser.add_argument("--no-tracemalloc",action="store_true",help="soak without tracemalloc, which about halves the speed")
+    parser.add_argument("--json",metavar="FILE",help="also write the results as JSON to FILE, - for stdout")
+    args=parser.parse_args(argv)
+    if args.bench == "startup":
+        result=bench_startup(args.n or 5)
+        report_startup(result)
+    elif args.bench == "tick":
+        result=bench_tick(args.n or 200,args.budget)
+        report_tick(result)
+    elif args.bench == "sidereal":
+        result=bench_sidereal(args.n or 5000)
+        report_sidereal(result)
+    else:
+        result=bench_soak(args.days,args.step,args.every,trace=not args.no_tracemalloc,
+                          limits={"rss":args.max_rss,"traced":args.max_traced,"items":args.max_items,"newest":args.max_items})
+        report_soak(result)
+    if args.json:
+        write_json(args.json,args.bench,result)
+    if args.bench in ("soak","sidereal") and result["failed"]:
+        raise SystemExit(1) #for a scheduled check
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#Observing targets on the dial.  A catalog of name, RA and Dec is read from a
+#text file and indexed by right ascension: the targets are split into bands of
+#declination and each band sorted by RA, so the targets within some hours of
+#the meridian are two binary searches a band (two more where the range wraps
+#through 0h) however long the catalog is.  Only what those searches find is
+#looked at, including for the altitude test, since each band can only be above
+#the horizon out to an hour angle worked out for the whole band.
+import math
+import numpy as np
+
+BAND=10.0 #degrees of declination a band
+
+def sexagesimal(text):
+    #"12:34:56.7", "12 34 56.7" or "-0:30" as a number of units, None for a plain number
+    parts=text.replace(":"," ").split()
+    if len(parts) < 2:
+        return None
+    value=sum(abs(float(part))/60**i for i,part in enumerate(parts))
+    return -value if text.strip().startswith("-") else value
+
+def read_ra(text):
+    #degrees from hours as h:m:s or from decimal degrees
+    hours=sexagesimal(text)
+    return float(text) if hours is None else hours*15
+
+def read_dec(text):
+    #degrees from d:m:s or decimal degrees
+    degrees=sexagesimal(text)
+    return float(text) if degrees is None else degrees
+
+def readcatalog(filename):
+    #Targets, one per line: name, RA, Dec.  RA is hours as 12:34:56.7 (or
+    #12 34 56.7) or decimal degrees, Dec degrees as -12:34:56 or decimal.
+    #Blank lines, lines starting with # and lines that can't be read (a header)
+    #are skipped.
+    names,ra,dec=[],[],[]
+    skipped=0
+    with open(filename) as f:
+        for line in f:
+            line=line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields=[field.strip() for field in line.split(",")]
+            try:
+                r,d=read_ra(fields[1]),read_dec(fields[2])
+            except (IndexError,ValueError):
+                skipped+=1
+                continue
+            names.append(fields[0])
+            ra.append(r)
+            dec.append(d)
+    if skipped:
+        print("%s: skipped %d lines that are not name, RA, Dec"%(filename,skipped))
+    return Catalog(names,ra,dec)
+
+def max_hour_angle(latitude,altitude,dec_lo,dec_hi):
+    #Hours of hour angle out to which something between dec_lo and dec_hi can
+    #be at altitude or higher at latitude (all degrees): 12 if some of it never
+    #sets below altitude, None if none of it gets that high.  cos(H) of the
+    #altitude circle has its least value at an edge of the band or where
+    #sin(dec)=sin(latitude)/sin(altitude).
+    phi,h=math.radians(latitude),math.radians(altitude)
+    decs=[dec_lo,dec_hi]
+    if abs(math.sin(h)) > 1e-9 and abs(math.sin(phi)/math.sin(h)) <= 1:
+        star=math.degrees(math.asin(math.sin(phi)/math.sin(h)))
+        if dec_lo < star < dec_hi:
+            decs.append(star)
+    best=1.0
+    for dec in decs:
+        d=math.radians(max(-89.999,min(89.999,dec)))
+        best=min(best,(math.sin(h)-math.sin(phi)*math.sin(d))/(math.cos(phi)*math.cos(d)))
+    if best > 1:
+        return None
+    if best <= -1:
+        return 12.0
+    return math.degrees(math.acos(best))/15
+
+class Catalog:
+    #names, ra and dec (degrees) of the targets, in index order: by band of
+    #declination, then by RA.  Queries return index arrays into them.
+    def __init__(self,names,ra,dec,band=BAND):
+        ra=np.asarray(ra,dtype=float)%360
+        dec=np.asarray(dec,dtype=float)
+        bands=np.floor((dec+90)/band).astype(int)
+        order=np.lexsort((ra,bands))
+        self.ra=ra[order]
+        self.dec=dec[order]
+        self.names=[names[i] for i in order]
+        self.bands=[] #(start, stop, lowest dec, highest dec) of each band
+        self.cap_cache={}
+        edges=np.flatnonzero(np.diff(bands[order]))+1
+        for start,stop in zip(np.r_[0,edges],np.r_[edges,len(order)]):
+            if stop > start:
+                self.bands.append((int(start),int(stop),float(self.dec[start:stop].min()),float(self.dec[start:stop].max())))
+
+    def __len__(self):
+        return len(self.names)
+
+    def window(self,start,stop,lo,hi):
+        #(first, last) index pairs in start:stop with RA from lo going east to
+        #hi degrees, two pairs when that is through 0h
+        if hi-lo >= 360:
+            return [(start,stop)]
+        ra=self.ra[start:stop]
+        i=start+int(ra.searchsorted(lo%360))
+        j=start+int(ra.searchsorted(hi%360))
+        if lo%360 <= hi%360:
+            return [(i,j)]
+        return [(i,stop),(start,j)]
+
+    def near_meridian(self,lst,hours,latitude=None,altitude=None,limit=None):
+        #Indices of the targets within hours of hour angle of the meridian at
+        #local sidereal time lst (hours) and, when latitude is given, at
+        #altitude degrees or higher.  In the order they cross the meridian;
+        #with a limit only the limit nearest the meridian, which are looked
+        #for first in a narrow window that is widened until it has them.
+        reach=hours
+        if limit is not None and len(self):
+            reach=min(hours,24.*limit/len(self))
+        while True:
+            index,ha=self.search(lst,reach,latitude,altitude)
+            if limit is None or len(index) >= limit or reach >= hours:
+                break
+            reach=min(hours,reach*2)
+        if limit is not None and len(index) > limit:
+            nearest=np.argpartition(np.abs(ha),limit-1)[:limit]
+            index,ha=index[nearest],ha[nearest]
+        return index[np.argsort(-ha,kind="stable")]
+
+    def search(self,lst,hours,latitude=None,altitude=None):
+        #(indices, hour angles) of the targets near_meridian looks for, in no order
+        ranges=[]
+        for (start,stop,dec_lo,dec_hi),cap in zip(self.bands,self.caps(latitude,altitude)):
+            if cap is None:
+                continue
+            reach=min(hours,cap)
+            ranges.extend(self.window(start,stop,(lst-reach)*15,(lst+reach)*15))
+        index=np.concatenate([np.arange(i,j) for i,j in ranges if j > i] or [np.zeros(0,dtype=int)])
+        ha=((lst*15-self.ra[index]+180)%360-180)/15
+        keep=np.abs(ha) <= hours
+        if latitude is not None and altitude is not None:
+            keep&=self.altitude(index,ha,latitude) >= altitude
+        return index[keep],ha[keep]
+
+    def caps(self,latitude,altitude):
+        #max_hour_angle of each band, the same for a site until its latitude changes
+        if latitude is None or altitude is None:
+            return [12.0]*len(self.bands)
+        key=(latitude,altitude)
+        if key not in self.cap_cache:
+            self.cap_cache={key:[max_hour_angle(latitude,altitude,lo,hi) for start,stop,lo,hi in self.bands]}
+        return self.cap_cache[key]
+
+    def altitude(self,index,ha,latitude):
+        #degrees above the horizon at latitude of targets index at hour angles ha (hours)
+        phi=math.radians(latitude)
+        dec=np.radians(self.dec[index])
+        return np.degrees(np.arcsin(math.sin(phi)*np.sin(dec)+math.cos(phi)*np.cos(dec)*np.cos(np.radians(ha*15))))
+
+    def targets(self,index):
+        #(name, ra, dec) of each of index
+        return [(self.names[i],float(self.ra[i]),float(self.dec[i])) for i in index]
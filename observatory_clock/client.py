@@ -0,0 +1,72 @@
+#The clock as a client of another clock started with --serve: the ClockStates
+#come from the server's /events stream instead of being computed here, so a
+#display started with --connect needs neither astropy nor the processor time.
+import json
+import threading
+from time import sleep
+from urllib.request import urlopen
+from .clockstate import from_json
+from .metrics import Metrics
+
+RETRY=5 #seconds between attempts to reach the server
+TIMEOUT=10 #seconds without a state (the server sends one a second) before reconnecting
+
+def server_url(address):
+    #host:port or a full http:// address, without a trailing /
+    if "://" not in address:
+        address="http://"+address
+    return address.rstrip("/")
+
+class ClockClient:
+    #Stands in for ClockWorker in the GUI: the newest ClockState is in
+    #self.latest, read the same way.  The site, refresh rates and sidereal mode
+    #are the server's, so refresh, set_site and set_refresh do nothing here.
+    def __init__(self,address,metrics=None):
+        self.url=server_url(address)
+        self.metrics=metrics or Metrics()
+        self.latest=None
+        self.eph=None #the body positions of latest, kept while the server's do not change
+        self.stopped=False
+        self.thread=None
+
+    def start(self):
+        self.thread=threading.Thread(target=self.run,daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped=True
+
+    def refresh(self):
+        pass
+
+    def set_site(self,site):
+        pass
+
+    def set_refresh(self,refresh):
+        pass
+
+    def run(self):
+        while not self.stopped:
+            try:
+                with urlopen(self.url+"/events",timeout=TIMEOUT) as stream:
+                    for line in stream:
+                        if self.stopped:
+                            return
+                        if line.startswith(b"data:"):
+                            self.receive(line[5:])
+            except (OSError,ValueError) as err:
+                print("clock server %s: %s"%(self.url,err))
+            if not self.stopped:
+                sleep(RETRY)
+
+    def receive(self,payload):
+        lap=self.metrics.lap()
+        self.metrics.tick()
+        state=from_json(json.loads(payload))
+        #the same positions object while the server's bodies are unchanged, the
+        #animation takes a new one to be a new ephemeris
+        if state.eph == self.eph:
+            state=state._replace(eph=self.eph)
+        self.eph=state.eph
+        self.latest=state
+        lap("receive")
@@ -0,0 +1,68 @@
+#What the display reads, with nothing to compute it: ClockState and RiseSet,
+#and their JSON form for the clock server (server.py) and its clients.  No
+#astropy here, so a client showing the server's clock never loads it.
+from datetime import datetime,date
+from collections import namedtuple
+from .constants import BODIES
+
+#An immutable snapshot of everything the display needs for one tick.  It is
+#produced off the Tk thread, by ClockWorker or compute_clock_state, and only
+#read by the GUI.
+ClockState=namedtuple("ClockState",["sitename","local","ut","ut_hour","jd","mjd",
+    "gast","last","stdelta","stangle","moonphase","riseset","eph"])
+
+#Sun rise/set times for one site and local date.  Times are timezone aware
+#local datetimes; each twilight is a (dusk,dawn) pair of this date's evening
+#and morning, which on the 24 hour dial bound the dark band.  Anything that
+#does not happen, e.g. astronomical darkness in a high latitude summer, is None.
+RiseSet=namedtuple("RiseSet",["date","sunrise","sunset","civil","nautical","astronomical"])
+
+class UTCTime(datetime):
+    #A ClockState's ut read back from JSON.  The display only formats it, as
+    #ut.utc.strftime(...) like the astropy Time it stands in for.
+    @property
+    def utc(self):
+        return self
+
+def isoformat(t):
+    return None if t is None else t.isoformat()
+
+def fromisoformat(t):
+    return None if t is None else datetime.fromisoformat(t)
+
+def hms_json(t):
+    return [int(t[0]),int(t[1]),float(t[2])]
+
+def to_json(state):
+    #a ClockState as a dict of plain numbers, strings and lists for json.dumps
+    rs=state.riseset
+    return {
+        "sitename":state.sitename,
+        "local":state.local.isoformat(),
+        "ut":state.ut.utc.isot,
+        "ut_hour":float(state.ut_hour),
+        "jd":float(state.jd),
+        "mjd":float(state.mjd),
+        "gast":hms_json(state.gast),
+        "last":hms_json(state.last),
+        "stdelta":float(state.stdelta),
+        "stangle":float(state.stangle),
+        "moonphase":float(state.moonphase),
+        "riseset":{"date":rs.date.isoformat(),"sunrise":isoformat(rs.sunrise),"sunset":isoformat(rs.sunset),
+                   "civil":None if rs.civil is None else [isoformat(t) for t in rs.civil],
+                   "nautical":None if rs.nautical is None else [isoformat(t) for t in rs.nautical],
+                   "astronomical":None if rs.astronomical is None else [isoformat(t) for t in rs.astronomical]},
+        "eph":{body:[float(x) for x in state.eph[body]] for body in BODIES},
+        }
+
+def from_json(data):
+    #the ClockState to_json made data from, the ut as a UTCTime and the body
+    #positions as a dict of (ra, dec, distance)
+    rs=data["riseset"]
+    twilight=lambda pair: None if pair is None else tuple(fromisoformat(t) for t in pair)
+    riseset=RiseSet(date.fromisoformat(rs["date"]),fromisoformat(rs["sunrise"]),fromisoformat(rs["sunset"]),
+                    twilight(rs["civil"]),twilight(rs["nautical"]),twilight(rs["astronomical"]))
+    return ClockState(data["sitename"],datetime.fromisoformat(data["local"]),UTCTime.fromisoformat(data["ut"]),
+                      data["ut_hour"],data["jd"],data["mjd"],tuple(data["gast"]),tuple(data["last"]),
+                      data["stdelta"],data["stangle"],data["moonphase"],riseset,
+                      {body:tuple(value) for body,value in data["eph"].items()})
@@ -0,0 +1,9 @@
+import math
+
+#some regularly used constanc
+pi12=math.pi/12
+pi2=math.pi/2
+pi24=math.pi/24
+
+#solar system bodies drawn on the dial, in the order the ephemeris returns them
+BODIES=("moon","sun","mercury","venus","mars","jupiter","saturn","uranus","neptune")
@@ -0,0 +1,106 @@
+#Local copies of the data astropy would otherwise download while the clock
+#runs: the IERS-A earth orientation table (UT1-UTC and polar motion, used by
+#sidereal time and every topocentric position), the leap second list and
+#optionally a JPL ephemeris.  prefetch() downloads them into the cache
+#directory when there is network; use_cache() points astropy at them and turns
+#off its automatic downloads, so a clock tick never waits on the network.
+import os
+import time
+import shutil
+
+CACHE_DIR=os.environ.get("OBSERVATORY_CLOCK_CACHE",os.path.join(os.path.expanduser("~"),".observatory-clock"))
+IERS_FILE="finals2000A.all"
+LEAP_FILE="Leap_Second.dat"
+STALE_DAYS=30 #IERS-A predictions are good for a few months, suggest a prefetch after this
+
+#set by configure(), applied by use_cache()
+settings={"cache_dir":None,"offline":False,"ephemeris":None}
+applied=False
+
+def configure(cache_dir=None,offline=False,ephemeris=None):
+    #Remember where the cache is and whether the network may be used at all,
+    #without importing astropy.  ephemeris is a JPL kernel name such as
+    #"de440s" that has been prefetched, None keeps astropy's built in one.
+    settings.update(cache_dir=cache_dir,offline=offline,ephemeris=ephemeris)
+
+def cache_path(name,cache_dir=None):
+    return os.path.join(cache_dir or settings["cache_dir"] or CACHE_DIR,name)
+
+def kernel_file(ephemeris):
+    return ephemeris.lower()+".bsp"
+
+def fetch(urls,path):
+    #the first of urls that downloads, copied into place so a reader never sees half a file
+    from astropy.utils.data import download_file
+    for url in urls:
+        try:
+            tmp=download_file(url,cache=False,timeout=30)
+        except Exception as err:
+            print("failed to download %s: %s"%(url,err))
+            continue
+        shutil.copyfile(tmp,path+".part")
+        os.replace(path+".part",path)
+        os.remove(tmp)
+        print("saved %s as %s"%(url,path))
+        return True
+    return False
+
+def prefetch(cache_dir=None,ephemeris=None):
+    #download the IERS-A table, the leap seconds and the JPL kernel named by
+    #ephemeris (if any) into the cache directory.  Returns True if all worked.
+    from astropy.utils import iers
+    cache_dir=cache_dir or settings["cache_dir"] or CACHE_DIR
+    os.makedirs(cache_dir,exist_ok=True)
+    ok=fetch([iers.conf.iers_auto_url,iers.conf.iers_auto_url_mirror],cache_path(IERS_FILE,cache_dir))
+    ok=fetch([iers.conf.iers_leap_second_auto_url,iers.conf.ietf_leap_second_auto_url],
+             cache_path(LEAP_FILE,cache_dir)) and ok
+    if ephemeris:
+        ok=fetch(["https://naif.jpl.nasa.gov/pub/naif/generic_kernels/spk/planets/%s"%kernel_file(ephemeris)],
+                 cache_path(kernel_file(ephemeris),cache_dir)) and ok
+    return ok
+
+def age_days(path):
+    return (time.time()-os.path.getmtime(path))/86400.
+
+def use_cache():
+    #Point astropy at the cached tables from configure() and stop it from
+    #downloading anything itself.  Missing tables fall back to the ones bundled
+    #with astropy, out of date ones degrade the accuracy with a warning rather
+    #than failing.  In offline mode astropy may not use the network at all.
+    #Only the first call does anything.
+    global applied
+    if applied:
+        return
+    applied=True
+    from astropy.utils import iers
+    from astropy.utils.data import conf as data_conf
+    iers.conf.auto_download=False
+    iers.conf.iers_degraded_accuracy="warn"
+    if settings["offline"]:
+        data_conf.allow_internet=False
+
+    path=cache_path(IERS_FILE)
+    if os.path.exists(path):
+        iers.earth_orientation_table.set(iers.IERS_A.open(path))
+        age=age_days(path)
+        print("IERS-A table from %s, %0.0f days old"%(path,age))
+        if age > STALE_DAYS:
+            print("the IERS-A table is getting old, update it with python -m observatory_clock --prefetch")
+    else:
+        print("no IERS-A table in %s, using the one bundled with astropy; get one with python -m observatory_clock --prefetch"
+              %os.path.dirname(path))
+
+    path=cache_path(LEAP_FILE)
+    if os.path.exists(path):
+        iers.conf.system_leap_second_file=path
+
+    if settings["ephemeris"]:
+        from astropy.coordinates import solar_system_ephemeris
+        path=cache_path(kernel_file(settings["ephemeris"]))
+        if os.path.exists(path):
+            try:
+                solar_system_ephemeris.set(path)
+            except Exception as err:
+                print("failed to use %s, using the built in ephemeris: %s"%(path,err))
+        else:
+            print("no %s in %s, using the built in ephemeris"%(kernel_file(settings["ephemeris"]),os.path.dirname(path)))
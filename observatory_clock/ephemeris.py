@@ -0,0 +1,169 @@
+import warnings
+from collections import namedtuple
+import numpy as np
+import threading
+import astropy.units as u
+from astropy.time import Time
+from astropy.coordinates import get_body_barycentric, get_body_barycentric_posvel, CartesianRepresentation, ICRS, GCRS
+from astropy.constants import c as speed_of_light
+from astropy.coordinates.baseframe import NonRotationTransformationWarning
+from .constants import BODIES
+
+#ICRS to topocentric GCRS is what we want, astropy warns about it on every call
+warnings.filterwarnings("ignore",category=NonRotationTransformationWarning)
+
+class BodyPositions:
+    #results of one Ephemeris.compute() pass, ra/dec in degrees and distance in AU.
+    #arrays are indexed [body] for a single time or [body,time] for an array of times.
+    def __init__(self,bodies,ra,dec,distance):
+        self.bodies=bodies
+        self.index={b:i for i,b in enumerate(bodies)}
+        self.ra=ra
+        self.dec=dec
+        self.distance=distance
+
+    def __getitem__(self,body):
+        i=self.index[body]
+        return (self.ra[i],self.dec[i],self.distance[i])
+
+class Ephemeris:
+    #Batched replacement for calling get_body once per planet.  The observer
+    #position, earth position and the ICRS->GCRS transformation (precession,
+    #nutation, aberration) are done once for all bodies instead of nine times,
+    #and so is the light time, see _apparent.  astropy's ephemerides take one
+    #body a call, so each body is still looked up on its own: twice, instead
+    #of get_body's loop of up to ten.  Results match astropy.coordinates.get_body.
+    def __init__(self,bodies=BODIES,ephemeris=None):
+        self.bodies=tuple(bodies)
+        self.ephemeris=ephemeris #None uses astropy's current solar_system_ephemeris
+
+    def _apparent(self,time,earth):
+        #Barycentric positions in AU, [body,xyz,...], of every body at the time
+        #its light left it.  The light time is solved for all bodies at once
+        #from one position and velocity each (the straight line is good to a
+        #few metres over the hours light takes from Neptune), then each body
+        #is looked up once more at that time.
+        pos,vel=[],[]
+        for body in self.bodies:
+            p,v=get_body_barycentric_posvel(body,time,self.ephemeris)
+            pos.append(p.xyz.to_value(u.AU))
+            vel.append(v.xyz.to_value(u.AU/u.s))
+        pos,vel=np.stack(pos),np.stack(vel)
+        earth=earth.xyz.to_value(u.AU)
+        c=speed_of_light.to_value(u.AU/u.s)
+        light_time=np.zeros(pos.shape[:1]+pos.shape[2:]) #seconds, [body,...]
+        for i in range(10):
+            new=np.linalg.norm(pos-vel*light_time[:,None]-earth,axis=1)/c
+            done=np.all(np.fabs(new-light_time) < 1e-8)
+            light_time=new
+            if done:
+                break
+        emitted=time-light_time*u.s
+        return np.stack([get_body_barycentric(body,emitted[i],self.ephemeris).xyz.to_value(u.AU)
+                         for i,body in enumerate(self.bodies)])
+
+    def compute(self,time,location=None):
+        if location is None:
+            location=time.location
+        if location is not None:
+            obsgeoloc,obsgeovel=location.get_gcrs_posvel(time)
+        else:
+            obsgeoloc,obsgeovel=None,None
+
+        earth=get_body_barycentric("earth",time,self.ephemeris)
+        if obsgeoloc is not None:
+            earth=earth+obsgeoloc
+
+        cart=CartesianRepresentation(np.moveaxis(self._apparent(time,earth),1,0)*u.AU)
+        gcrs=ICRS(cart).transform_to(GCRS(obstime=time,obsgeoloc=obsgeoloc,obsgeovel=obsgeovel))
+        return BodyPositions(self.bodies,gcrs.ra.deg,gcrs.dec.deg,gcrs.distance.to_value(u.AU))
+
+#one build of an EphemerisTable: grid times, unwrapped ra, dec and distance
+#[body,time], the location and the worst interpolation error in arcsec
+TableGrid=namedtuple("TableGrid",["jd","ra","dec","distance","location","max_error"])
+
+def grid_covers(grid,time,margin=0*u.hour):
+    if grid is None or time.location != grid.location:
+        return False
+    return grid.jd[0] <= time.jd <= grid.jd[-1]-margin.to_value(u.day)
+
+class EphemerisTable:
+    #Precomputed ephemeris for all bodies on a coarse time grid (default every
+    #10 minutes for 36 hours) answered by linear interpolation.  The build is
+    #done once a night in a background thread; max_error is the worst
+    #interpolation error in arcseconds, checked against Ephemeris.compute at
+    #every grid midpoint when the table is built.  A build is published as
+    #one TableGrid, so a reader that takes self.grid once never mixes two.
+    def __init__(self,ephemeris,step=10*u.min,span=36*u.hour):
+        self.ephemeris=ephemeris
+        self.step=step
+        self.span=span
+        self.grid=None #TableGrid of the newest build
+        self.building=False
+        self.verbose=False #print each build and its error
+
+    @property
+    def jd(self):
+        grid=self.grid
+        return None if grid is None else grid.jd
+
+    @property
+    def location(self):
+        grid=self.grid
+        return None if grid is None else grid.location
+
+    @property
+    def max_error(self):
+        grid=self.grid
+        return None if grid is None else grid.max_error
+
+    def build(self,start,location):
+        n=int(round((self.span/self.step).decompose().value))
+        grid=Time(start,location=location)+np.arange(n+1)*self.step
+        pos=self.ephemeris.compute(grid)
+        ra=np.unwrap(pos.ra,period=360,axis=1)
+        #check the interpolation against the direct calculation halfway between grid points
+        mid=grid[:-1]+self.step/2
+        direct=self.ephemeris.compute(mid)
+        dra=((ra[:,:-1]+ra[:,1:])/2-direct.ra+180)%360-180
+        ddec=(pos.dec[:,:-1]+pos.dec[:,1:])/2-direct.dec
+        err=np.hypot(dra*np.cos(np.radians(direct.dec)),ddec)*3600
+
+        #one assignment swaps the whole new table in
+        self.grid=TableGrid(grid.jd,ra,pos.dec,pos.distance,location,err.max())
+        if self.verbose:
+            print("ephemeris table built for %s to %s, max interpolation error %0.3f arcsec"
+                  %(grid[0].utc.iso,grid[-1].utc.iso,self.grid.max_error))
+
+    def build_background(self,start,location):
+        #build in a worker thread, ignored if a build is already running
+        if self.building:
+            return
+        self.building=True
+        def run():
+            try:
+                self.build(start,location)
+            except Exception as err:
+                print("failed to build ephemeris table: %s"%err)
+            finally:
+                self.building=False
+        threading.Thread(target=run,daemon=True).start()
+
+    def covers(self,time,margin=0*u.hour):
+        return grid_covers(self.grid,time,margin)
+
+    def interpolate(self,time,grid=None):
+        jd,ra,dec,distance=(grid or self.grid)[:4]
+        t=time.jd
+        bodies=self.ephemeris.bodies
+        ra=np.array([np.interp(t,jd,ra[i]) for i in range(len(bodies))])%360
+        dec=np.array([np.interp(t,jd,dec[i]) for i in range(len(bodies))])
+        distance=np.array([np.interp(t,jd,distance[i]) for i in range(len(bodies))])
+        return BodyPositions(bodies,ra,dec,distance)
+
+    def compute(self,time,location=None):
+        #same as Ephemeris.compute, from the table when it covers time
+        grid=self.grid
+        if grid_covers(grid,time):
+            return self.interpolate(time,grid)
+        return self.ephemeris.compute(time,location)
@@ -0,0 +1,197 @@
+#Upcoming events: the next meridian transit, rise and set of the sun, moon and
+#each planet at the site and the next moon quarters.  The positions are worked
+#out on a coarse grid (every 20 minutes for 3 days, the moon and sun every 6
+#hours for 5 weeks) in one batched Ephemeris pass, and an event is where the
+#hour angle, the altitude less the horizon or the moon's elongation from the
+#sun changes sign between grid points, refined with a few interpolation steps
+#for every event at once.  The events go in a priority queue; those that pass
+#are popped, and the grid is only worked out again (in the background) when it
+#is running out or the site changes, so asking for them each tick costs nothing.
+import heapq
+import threading
+from collections import namedtuple
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+from astropy.coordinates import GCRS, TETE
+from .constants import BODIES
+from .ephemeris import Ephemeris
+from .sidereal import fast_sidereal
+from .sweep import sun_altitude
+
+#altitude in degrees of the centre at rise and set: refraction and the size of
+#the sun and moon.  The positions are topocentric, the moon's parallax is
+#already in them (the usual +0.125 for the moon is for a geocentric one).
+HORIZON={"sun":-0.8333,"moon":-0.8333}
+PLANET_HORIZON=-0.5667
+QUARTERS=("new moon","first quarter","full moon","last quarter")
+OBLIQUITY=23.4393 #degrees, for ecliptic longitudes
+STEP=20*u.min #grid of the body positions
+SPAN=3*u.day #and how far it goes, rebuilt when less than half is left
+QUARTER_STEP=6*u.hour
+QUARTER_SPAN=35*u.day #rebuilt when less than a week is left
+QUARTER_LEFT=7 #days
+
+#an event at jd (UT), kind is "rise", "transit", "set" or one of QUARTERS
+Event=namedtuple("Event",["jd","body","kind"])
+
+def wrap(degrees):
+    return (degrees+180)%360-180
+
+def crossings(jd,f,wrapped=False):
+    #(indices i, rising) where f changes sign between jd[i] and jd[i+1],
+    #rising when it goes up.  For an angle (wrapped) the jump from +180 to
+    #-180 is not a crossing.
+    below=f < 0
+    i=np.flatnonzero(below[:-1] != below[1:])
+    if wrapped:
+        i=i[np.abs(f[i+1]-f[i]) < 180]
+    return i,f[i+1] > f[i]
+
+def refine(func,t0,t1,f0,f1,steps=3):
+    #times between t0 and t1 (arrays) where func, which changes sign there, is
+    #zero, by regula falsi on all of them at once
+    for k in range(steps):
+        t=t0+f0/(f0-f1)*(t1-t0)
+        f=func(t)
+        left=np.signbit(f) == np.signbit(f0)
+        t0,f0=np.where(left,t,t0),np.where(left,f,f0)
+        t1,f1=np.where(left,t1,t),np.where(left,f1,f)
+    return t0+f0/(f0-f1)*(t1-t0)
+
+def ecliptic_longitude(ra,dec):
+    ra,dec,eps=np.radians(ra),np.radians(dec),np.radians(OBLIQUITY)
+    return np.degrees(np.arctan2(np.sin(ra)*np.cos(eps)+np.tan(dec)*np.sin(eps),np.cos(ra)))%360
+
+def of_date(time,ra,dec):
+    #RA and Dec (degrees) on the true equator and equinox of date at time.
+    #GCRS, which the ephemeris gives, keeps the J2000 axes, but hour angles
+    #are from the apparent sidereal time of date: by 2025 precession alone is
+    #over a minute of RA.  It hardly changes over a few days, so one rotation,
+    #of the three axes, does the whole grid.
+    axes=GCRS(ra=[0,90,0]*u.deg,dec=[0,0,90]*u.deg,obstime=time).transform_to(TETE(obstime=time))
+    ra,dec=np.radians(ra),np.radians(dec)
+    xyz=np.einsum("ij,j...->i...",axes.cartesian.xyz.value,
+                  np.stack([np.cos(dec)*np.cos(ra),np.cos(dec)*np.sin(ra),np.sin(dec)]))
+    return np.degrees(np.arctan2(xyz[1],xyz[0]))%360,np.degrees(np.arcsin(np.clip(xyz[2],-1,1)))
+
+def body_events(jd,ra,dec,latf,lonf,bodies=BODIES):
+    #Events of each body over the grid times jd from its RA and Dec of date
+    #(arrays [body,time] in degrees)
+    events=[]
+    lst=lambda t: fast_sidereal(t,lonf)
+    for n,body in enumerate(bodies):
+        ra_body=np.unwrap(ra[n],period=360)
+        dec_body=dec[n]
+        at=lambda t: (np.interp(t,jd,ra_body),np.interp(t,jd,dec_body))
+        def hour_angle(t):
+            r,d=at(t)
+            return wrap(lst(t)*15-r)
+        def altitude(t):
+            r,d=at(t)
+            return sun_altitude(latf,r,d,lst(t))-HORIZON.get(body,PLANET_HORIZON)
+        for func,wrapped in ((hour_angle,True),(altitude,False)):
+            f=func(jd)
+            i,rising=crossings(jd,f,wrapped)
+            if len(i) == 0:
+                continue
+            t=refine(func,jd[i],jd[i+1],f[i],f[i+1])
+            for t,up in zip(t,rising):
+                if func is hour_angle:
+                    events.append(Event(float(t),body,"transit")) #the hour angle only grows through 0
+                else:
+                    events.append(Event(float(t),body,"rise" if up else "set"))
+    return events
+
+def quarter_events(jd,pos):
+    #the moon quarters over the grid times jd with geocentric BodyPositions pos of the moon and sun
+    moon=ecliptic_longitude(*pos["moon"][:2])
+    sun=ecliptic_longitude(*pos["sun"][:2])
+    elongation=np.unwrap(moon-sun,period=360)
+    events=[]
+    for k,name in enumerate(QUARTERS):
+        f=wrap(elongation-90*k)
+        i,rising=crossings(jd,f,wrapped=True)
+        i=i[rising] #the elongation only grows
+        func=lambda t: wrap(np.interp(t,jd,elongation)-90*k)
+        events.extend(Event(float(t),"moon",name) for t in refine(func,jd[i],jd[i+1],f[i],f[i+1]))
+    return events
+
+class EventEngine:
+    #The events at a site (a SiteContext) after any time.  upcoming(jd) gives
+    #the next of each body and kind from the queue; the grids are built in a
+    #background thread when needed, until then upcoming is whatever is known.
+    def __init__(self,site,ephemeris=None):
+        self.site=site
+        self.ephemeris=ephemeris or Ephemeris()
+        self.moonsun=Ephemeris(("moon","sun"),self.ephemeris.ephemeris)
+        self.bodies=None #(site, first jd, last jd, events) of the body grid
+        self.quarters=None #(first jd, last jd, events) of the quarter grid
+        self.heap=[]
+        self.queued=(None,None) #the bodies and quarters in heap
+        self.popped=None #jd the heap was last popped to
+        self.result=None #the answer of the last upcoming(), until the queue changes
+        self.building=False
+
+    def set_site(self,site):
+        self.site=site
+        self.queued=(None,None) #the old site's events leave the queue straight away
+
+    def build(self,jd,site):
+        #work out the grids that need it for jd
+        bodies,quarters=self.bodies,self.quarters
+        if bodies is None or bodies[0] is not site or not bodies[1] <= jd <= bodies[2]-SPAN.to_value(u.day)/2:
+            grid=Time(jd,format="jd",location=site.location)+np.arange(int(round((SPAN/STEP).decompose().value))+1)*STEP
+            pos=self.ephemeris.compute(grid)
+            ra,dec=of_date(grid[len(grid)//2],pos.ra,pos.dec)
+            events=body_events(grid.jd,ra,dec,site.latf,site.lonf,self.ephemeris.bodies)
+            self.bodies=(site,grid.jd[0],grid.jd[-1],events)
+        if quarters is None or not quarters[0] <= jd <= quarters[1]-QUARTER_LEFT:
+            grid=Time(jd,format="jd")+np.arange(int(round((QUARTER_SPAN/QUARTER_STEP).decompose().value))+1)*QUARTER_STEP
+            self.quarters=(grid.jd[0],grid.jd[-1],quarter_events(grid.jd,self.moonsun.compute(grid)))
+
+    def build_background(self,jd):
+        if self.building:
+            return
+        self.building=True
+        def run():
+            try:
+                self.build(jd,self.site)
+            except Exception as err:
+                print("failed to work out the events: %s"%err)
+            finally:
+                self.building=False
+        threading.Thread(target=run,daemon=True).start()
+
+    def stale(self,jd):
+        bodies,quarters=self.bodies,self.quarters
+        return (bodies is None or bodies[0] is not self.site or not bodies[1] <= jd <= bodies[2]-SPAN.to_value(u.day)/2
+                or quarters is None or not quarters[0] <= jd <= quarters[1]-QUARTER_LEFT)
+
+    def upcoming(self,jd):
+        #The next event of each body and kind after jd (UT), soonest first.
+        #Only the queue is looked at, and only its top unless an event passed.
+        if self.stale(jd):
+            self.build_background(jd)
+        bodies,quarters=self.bodies,self.quarters
+        if bodies is not self.queued[0] or quarters is not self.queued[1] or self.popped is None or jd < self.popped:
+            #a new grid, or going back in time past events already popped.  A
+            #grid that does not cover jd (yet) would leave out the events in between.
+            self.heap=((bodies[3] if bodies and bodies[0] is self.site and bodies[1] <= jd <= bodies[2] else [])
+                       +(quarters[2] if quarters and quarters[0] <= jd <= quarters[1] else []))
+            heapq.heapify(self.heap)
+            self.queued=(bodies,quarters)
+            self.result=None
+        self.popped=jd
+        while self.heap and self.heap[0].jd <= jd:
+            heapq.heappop(self.heap)
+            self.result=None
+        if self.result is None:
+            seen=set()
+            answer=[]
+            for event in sorted(self.heap):
+                if (event.body,event.kind) not in seen:
+                    seen.add((event.body,event.kind))
+                    answer.append(event)
+            self.result=answer
+        return self.result
@@ -0,0 +1,334 @@
+import math
+from functools import lru_cache
+from .constants import pi12, pi2, pi24, BODIES
+from .render import DisplayList
+
+SYMBOLS={"moon":u"\u263E","sun":u"\u2609","mercury":u"\u263F","venus":u"\u2640","mars":u"\u2642",
+         "jupiter":u"\u2643","saturn":u"\u2644","uranus":u"\u26E2","neptune":u"\u2646"}
+
+class Geometry:
+    #The trigonometry of a clock face width pixels across.  The directions of
+    #the 48 hour ticks, the 24 hour numbers and the 24 right ascension steps
+    #are worked out once here, and the pixel positions of the ticks and numbers
+    #that never move; everything else is a radius and an angle from the centre.
+    def __init__(self,width):
+        self.width=width
+        self.center=width/2
+        self.ticks=[(math.cos(i*pi24-pi2),math.sin(i*pi24-pi2)) for i in range(48)]
+        self.hours=self.ticks[::2]
+        self.ra=[(math.cos(i*pi12),math.sin(i*pi12)) for i in range(24)] #steps of one hour of RA from any angle
+        self.hour_numbers=[self.point(0.92,c,s) for c,s in self.hours]
+        self.tick_lines=[self.point(0.81,c,s)+self.point(0.84,c,s) for c,s in self.ticks]
+
+    def point(self,radius,cos,sin):
+        #the pixel at radius (a fraction of the face) in the direction (cos, sin)
+        return (self.center+radius*self.center*cos,self.center+radius*self.center*sin)
+
+    def polar(self,radius,angle):
+        return self.point(radius,math.cos(angle),math.sin(angle))
+
+    def ring(self,radius,angle):
+        #24 points an hour of RA apart starting at angle, rotating the cached
+        #steps instead of 24 more cos and sin
+        c,s=math.cos(angle),math.sin(angle)
+        return [self.point(radius,c*rc-s*rs,s*rc+c*rs) for rc,rs in self.ra]
+
+@lru_cache(maxsize=8)
+def geometry(width):
+    #shared by every face of that size, and kept for the last few sizes so
+    #dragging a window back and forth does not recompute them
+    return Geometry(width)
+
+class ClockFace:
+    #The analog clock drawn into a DisplayList, independent of Tk.  The GUI
+    #copies the list onto its canvas with TkRenderer; render_svg and render_png
+    #turn the same list into image files with no display at all.
+    def __init__(self,width=420,font="Courier",fontsize=16,background="white",smooth=False,snap=False):
+        self.font=font
+        self.fontsize=fontsize
+        self.bckgrnd=background
+        self.smooth=smooth #hands to the fraction of a second for animation, otherwise to the minute
+        self.snap=snap #items to whole pixels, see DisplayList
+        self.state=None #the ClockState last drawn
+        self.targets=[] #(name, ra, dec) of catalog targets to mark on the RA ring
+        self.marked=0 #target items shown
+        self.set_size(width)
+        self.build()
+
+    def set_size(self,width):
+        self.WIDTH=width
+        self.HEIGHT=self.WIDTH #force square for circular clock.
+        self.WIDTH2=self.WIDTH/2  #this is done alot, so make it quicker on the computer.
+        self.HEIGHT2=self.HEIGHT/2
+        self.geo=geometry(width)
+
+    def resize(self,width,fontsize=None):
+        #Scale the face to a new size in place: every item keeps its tag (and
+        #so its canvas item), the static ones are moved to their positions for
+        #the new size and the moving ones redrawn from the last state.
+        if fontsize is not None:
+            self.fontsize=fontsize
+        self.set_size(width)
+        self.display.resize(self.WIDTH,self.HEIGHT)
+        self.display.place("face",0, 0, self.WIDTH, self.HEIGHT)
+        for tag in ("night","civil","nautical","astronomical"):
+            self.display.place(tag,2, 2, self.WIDTH, self.HEIGHT)
+        for i,(x,y) in enumerate(self.geo.hour_numbers):
+            self.display.place("hour%d"%i,x,y)
+        for i,coords in enumerate(self.geo.tick_lines):
+            self.display.place("tick%d"%i,*coords)
+        for tag,item in self.display.items.items():
+            if item.kind == "text":
+                self.display.place(tag,font=self.text_font(tag))
+        if self.state is not None:
+            self.update(self.state)
+
+    def text_font(self,tag):
+        if tag == "overlay":
+            return (self.font, max(7, self.fontsize//2))
+        return (self.font, self.fontsize)
+
+    def build(self):
+        #Add every item once, in drawing order so the stacking is right.  The
+        #static face is drawn here; everything that moves is added hidden and
+        #then positioned each tick by the draw_* functions.
+        self.display=DisplayList(self.WIDTH,self.HEIGHT,self.bckgrnd,self.snap)
+        self.display.add("night","arc",(2, 2, self.WIDTH, self.HEIGHT), hidden=True, start=0, extent=0, fill="#eeeeee")
+        for tag,color in (("civil","#e2e2e2"),("nautical","#d6d6d6"),("astronomical","#cacaca")):
+            self.display.add(tag,"arc",(2, 2, self.WIDTH, self.HEIGHT), hidden=True, start=0, extent=0, fill=color, outline="")
+        self.new_line("sunrise",fill="green", width=2)
+        self.new_line("sunset",fill="green", width=2)
+        for i in range(24):
+            self.new_text("ralabel%d"%i,"",fill="blue")
+        for i in range(24):
+            self.new_line("ratick%d"%i,fill="blue", width=1)
+        self.draw_face_lines(font=self.font,fontsize=self.fontsize)
+        for tag in ("new","full","first","third"):
+            self.new_line(tag,fill="black", width=1)
+        self.new_text("quarter1",u"1",fill="black")
+        self.new_text("quarter3",u"3",fill="black")
+        self.new_line("hourhand",fill="purple", width=4,arrow='last')
+        self.new_line("horizon1",fill="grey", width=1)
+        self.new_line("horizon2",fill="grey", width=1)
+        self.new_line("uthand",fill="red", width=4,arrow='last')
+        self.new_line("lsthand",fill="blue", width=5,arrow='last')
+        for body in BODIES:
+            self.new_text(body,SYMBOLS[body],fill="black")
+        self.display.add("overlay","text",(4, 4), hidden=True, text="", anchor="nw", justify="left",
+                         font=self.text_font("overlay"), fill="darkgreen")
+
+    def new_line(self,tag,**options):
+        self.display.add(tag,"line",(0, 0, 0, 0), hidden=True, **options)
+
+    def new_text(self,tag,text,**options):
+        self.display.add(tag,"text",(0, 0), hidden=True, text=text, font=self.text_font(tag), **options)
+
+    def move(self,tag,*coords,**options):
+        #reposition an existing item and make sure it is visible
+        self.display.move(tag,*coords,**options)
+
+    def hide(self,*tags):
+        self.display.hide(*tags)
+
+    def show_overlay(self,text):
+        #the instrumentation overlay in the top left corner, None hides it
+        if text is None:
+            self.hide("overlay")
+        else:
+            self.move("overlay",4,4,text=text)
+
+    def draw_object(self,tag,angle,stdelta,radius,color="red"):
+        hour_angle = angle/15* pi12 +stdelta* pi12-pi2 #takes angle in degrees
+        self.move(tag, *self.geo.polar(radius,hour_angle), fill=color)
+
+    def draw_targets(self,stdelta):
+        #the catalog targets as dots on the RA ring, items are added as more are needed
+        r=max(1.5,self.WIDTH/250.)
+        for i,(name,ra,dec) in enumerate(self.targets):
+            tag="target%d"%i
+            if tag not in self.display.items:
+                self.display.add(tag,"oval",(0, 0, 0, 0), hidden=True, fill="darkorange", outline="")
+            x,y=self.geo.polar(0.7,ra/15* pi12 +stdelta* pi12-pi2)
+            self.move(tag, x-r, y-r, x+r, y+r)
+        self.hide(*["target%d"%i for i in range(len(self.targets),self.marked)])
+        self.marked=len(self.targets)
+
+    def draw_body(self,body,stdelta,radius,color="red"):
+        #draw a solar system body at its right ascension from the latest ephemeris
+        self.draw_object(body,self.eph[body][0],stdelta,radius,color=color)
+
+    def draw_face_lines(self,font="times",fontsize=16):
+        # Draw clock face
+        self.display.add("face","oval",(0, 0, self.WIDTH, self.HEIGHT), outline="purple", width=3)
+
+        # Draw hour numbers, at positions from the geometry table
+        for i,(x,y) in enumerate(self.geo.hour_numbers):
+            # if self.sethour==0:
+            self.display.add("hour%d"%i,"text",(x, y), text=str(i), font=self.text_font("hour%d"%i),fill="black")
+            # else:
+            #     self.canvas.create_text(x, y, text=str(i), font=(self.font, self.fontsize),fill="red")
+
+        # Draw hour lines
+        for i,coords in enumerate(self.geo.tick_lines):
+            if i % 2 == 0:
+                self.display.add("tick%d"%i,"line",coords, fill="black", width=3)
+            else:
+                self.display.add("tick%d"%i,"line",coords, fill="black", width=1)
+
+    def draw_st(self,sti,stangle,font="times",fontsize=12):
+        # Draw ST hour numbers, a rotating dail of right ascension numbers
+        st=sti[0]+sti[1]/60.+sti[2]/3600.
+        angle=stangle-sti[1]/60*pi12 #of the first label, the rest follow an hour apart
+        for i,(x,y) in enumerate(self.geo.ring(0.74,angle)):
+            l=int(st+i)
+            self.move("ralabel%d"%i, x, y, text=str(l%24))
+        # Draw hour lines for Right ascension/LST
+        for i,(p1,p2) in enumerate(zip(self.geo.ring(0.65,angle),self.geo.ring(0.67,angle))):
+            self.move("ratick%d"%i, *(p1+p2))
+
+
+    def local_angle(self,t):
+        #angle on the 24 hour local time dial of a datetime
+        return (t.hour + t.minute/60) * pi12 - pi2
+
+    def draw_sunrise_sunset(self):
+        rs=self.riseset
+        if rs.sunrise is None or rs.sunset is None:
+            self.hide("night","sunrise","sunset")
+        else:
+            # Draw sunrise
+            hour_angle_sr = self.local_angle(rs.sunrise)
+            self.sunrise_ang=math.degrees(hour_angle_sr)
+            hour_angle_ss = self.local_angle(rs.sunset)
+            self.sunset_ang=math.degrees(hour_angle_ss)
+            night=(self.sunrise_ang-self.sunset_ang)%360
+            # print(self.sunrise_ang,night)
+            self.move("night", start=-self.sunrise_ang,extent=night)
+
+            self.move("sunrise", *self.radial(0.5,0.7,hour_angle_sr))
+
+            # Draw sunset
+            self.move("sunset", *self.radial(0.5,0.7,hour_angle_ss))
+
+        # Draw the twilight bands, darker as the sun gets further below the horizon
+        for name in ("civil","nautical","astronomical"):
+            if getattr(rs,name) is None:
+                self.hide(name)
+                continue
+            dusk,dawn=getattr(rs,name)
+            dusk_ang=math.degrees(self.local_angle(dusk))
+            dawn_ang=math.degrees(self.local_angle(dawn))
+            self.move(name, start=-dawn_ang,extent=(dawn_ang-dusk_ang)%360)
+
+    def radial(self,inner,outer,angle):
+        #a line along angle from radius inner to outer, both fractions of the face
+        c,s=math.cos(angle),math.sin(angle)
+        return self.geo.point(inner,c,s)+self.geo.point(outer,c,s)
+
+    def hand(self,tag,radius,angle):
+        #a line from the centre, radius a fraction of the face
+        self.move(tag, self.WIDTH2, self.HEIGHT2, *self.geo.polar(radius,angle))
+
+    def draw_mooncross(self,sun_ra,stdelta):
+        #Draw moon phase cross
+        #new
+        sun_angle = sun_ra/15* pi12 +stdelta* pi12-pi2
+        self.hand("new", 0.15, sun_angle)
+        # self.draw_object("new",sun_ra,stdelta,0.15,color="black")
+        #full
+        self.hand("full", 0.15, sun_angle+math.pi)
+        #1st
+        self.hand("first", 0.15, sun_angle+pi2)
+        self.draw_object("quarter1",sun_ra+90,stdelta,0.17,color="black")
+        #3rd
+        self.hand("third", 0.15, sun_angle-pi2)
+        self.draw_object("quarter3",sun_ra-90,stdelta,0.17,color="black")
+
+
+    def clock_hours(self):
+        #local time in hours, to the minute like the clock always has, or
+        #continuous when animating
+        t=self.local
+        if self.smooth:
+            return t.hour + t.minute/60 + (t.second + t.microsecond/1e6)/3600
+        return t.hour + t.minute/60
+
+    def draw_hourhand(self):
+        # Draw hour hand
+        hour_angle = self.clock_hours() * pi12 - pi2
+        self.hand("hourhand", 0.9, hour_angle)
+
+    def draw_horizon(self):
+        #draw the "effective" horizon at + and - 6 hours from the merdian (hour hand)
+        # Draw perpendicular 1
+        hour_angle = self.clock_hours() * pi12
+        self.hand("horizon1", 0.7, hour_angle)
+        # Draw  perpendicular 2
+        self.hand("horizon2", 0.7, hour_angle - pi2-pi2)
+
+    def draw_uthour(self,ut_hour):
+        # Draw UT hour hand
+        hour_angle = (ut_hour + self.clock_hours() - self.local.hour) * pi12 - pi2
+        self.hand("uthand", 0.8, hour_angle)
+
+    def draw_LSThour(self,stangle):
+        # Draw LAST hour hand
+        hour_angle = stangle #* pi12 - pi2
+        self.hand("lsthand", 0.6, hour_angle)
+
+
+    def draw_moonsym(self,stdelta):
+        #admust the greyscale level based on the phave.
+        if self.moonphase < 0.125 and self.moonphase > 0.875:
+            #new
+            self.draw_body("moon",stdelta,0.1,color="#cccccc")
+        elif self.moonphase > 0.125 and self.moonphase < 0.375:
+            #wax quarter
+            self.draw_body("moon",stdelta,0.1,color="#666666")
+        elif self.moonphase > 0.375 and self.moonphase < 0.625:
+            #full
+            self.draw_body("moon",stdelta,0.1,color="#222222")
+        elif self.moonphase > 0.625 and self.moonphase < 0.875:
+            #wanning quarter
+            self.draw_body("moon",stdelta,0.1,color="#666666")
+        else:
+            self.draw_body("moon",stdelta,0.1,color="black")
+
+    def update(self,state):
+        #Draw Astroclock for a ClockState
+        self.state=state
+        self.local=state.local
+        self.moonphase=state.moonphase
+        self.riseset=state.riseset
+        self.eph=state.eph
+        ut_hour=state.ut_hour
+        LAST=state.last
+        stdelta=state.stdelta
+        stangle=state.stangle
+        sun_ra,sun_dec,sun_dist=self.eph["sun"]
+
+        self.draw_sunrise_sunset()
+        self.draw_st(LAST,stangle)
+        self.draw_targets(stdelta)
+        self.draw_mooncross(sun_ra,stdelta)
+        self.draw_hourhand()
+        self.draw_horizon()
+        self.draw_uthour(ut_hour)
+        self.draw_LSThour(stangle)
+        self.draw_moonsym(stdelta)
+
+        #draw the solar system objects
+        self.draw_body("sun",stdelta,0.3,color="black")
+        if self.eph["mercury"][2]<sun_dist:
+            self.draw_body("mercury",stdelta,0.25,color="black")
+        else:
+            self.draw_body("mercury",stdelta,0.35,color="#b22222")
+        if self.eph["venus"][2]<sun_dist:
+            self.draw_body("venus",stdelta,0.2,color="black")
+        else:
+            self.draw_body("venus",stdelta,0.4,color="#b22222")
+        self.draw_body("mars",stdelta,0.5,color="#8b0000")
+        self.draw_body("jupiter",stdelta,0.55,color="grey")
+        self.draw_body("saturn",stdelta,0.58,color="grey")
+        self.draw_body("uranus",stdelta,0.62,color="#00bfff")
+        self.draw_body("neptune",stdelta,0.67,color="#00bfff")
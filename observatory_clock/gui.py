@@ -0,0 +1,858 @@
+import math
+import threading
+from time import time, perf_counter
+from datetime import timedelta
+import tkinter as tk
+from tkinter import filedialog as fd
+from tkinter import font as tkfont
+from . import UPDATED, version
+from .prefs import DEFAULTS, PREFS_FILE, SITE_KEYS, PrefsWatcher, load, save, validate, flatten, active_site, set_site
+from .metrics import Metrics
+from .animate import Animator, SIDEREAL_RATE
+from .sidereal import split_hours
+from .face import ClockFace
+from .render import TkRenderer
+
+LOG_INTERVAL=60 #seconds between lines of the metrics log
+POLL_OFFSET=30 #ms after the second to look for the worker's new state
+WATCH_INTERVAL=2 #seconds between looks for a changed preferences file
+RESIZE_DELAY=100 #ms the window size has to settle before the clock is scaled to it
+MIN_SIZE=100 #smallest clock in pixels
+SCRUB_DELAY=50 #ms between frames while time travelling
+SLIDER_DAYS=30 #the time travel slider goes this many days either side of now
+
+def scaled_fontsize(fontsize,size,width):
+    #fontsize for a clock size pixels across that is fontsize at width
+    return max(6,int(round(fontsize*size/float(width))))
+
+def poll_delay():
+    #ms to the next look for a new state.  The worker ticks on the second so
+    #look just after it, and every 250 ms in between to pick up a refresh.
+    return min(1000-int((time()%1)*1000)+POLL_OFFSET,250)
+
+def hhmm(t):
+    if t is None:
+        return "--:--"
+    return t.strftime("%H:%M")
+
+def hms(t):
+    #an (hours, minutes, seconds) sidereal time as hh:mm:ss
+    return "%02d:%02d:%02d"%(t[0],t[1],int(t[2]))
+
+class App:
+    def __init__(self,master,metrics_log=None,prefs_file=PREFS_FILE,server=None):
+        self.bckgrnd='white' #background color
+        self.fg1='purple' #foreground color 1
+        self.fg2='black' #foreground color 2
+        self.fontsize=DEFAULTS["fontsize"] #fontsize and WIDTH are inter-related
+        self.font="Courier" #this should remain a fixed-width font
+        self.WIDTH=DEFAULTS["WIDTH"]
+        self.fontsize_def=DEFAULTS["fontsize"]
+        self.WIDTH_def=DEFAULTS["WIDTH"]
+        latitude = DEFAULTS["latf"] # your latitude in decimal degrees
+        longitude = DEFAULTS["lonf"] # your longitude in decimal degrees West is negative
+        self.lat = "%sd"%latitude
+        self.lon = "%sd"%longitude
+        self.latf = latitude
+        self.lonf = longitude
+        self.latf_def=latitude
+        self.lonf_def=longitude
+        # self.sethour=0 #this is from a texting version of the code to manually change time.  Not actively used.
+        self.moonphase=0
+        self.moonphaseold=0
+        self.sitename=DEFAULTS["sitename"]
+        self.sitename_def=self.sitename
+        self.E1=0 #entry boxes for setting the site.
+        self.E2=0
+        self.E3=0
+        self.E4=0
+        self.E5=0
+        self.E6=0
+        self.state=None #ClockState currently on display
+        self.sidereal_mode="fast" #or "astropy" for the reference sidereal time
+        self.tz=None #timezone name, None is the computer's
+        self.elevation=0.0
+        self.prefs_file=prefs_file
+        self.loadprefs()
+        self.watcher=PrefsWatcher(prefs_file) #picks up edits to the file while the clock runs
+        self.watched=time()
+        self.site=None #SiteContext and ClockWorker, made by load_astronomy
+        self.worker=None
+        self.server=server #host:port of a clock started with --serve to show instead of computing, see client.py
+        self.metrics=Metrics() #tick timings for the overlay and the metrics log
+        self.overlay=False
+        self.metrics_log=metrics_log #file to append the metrics to every LOG_INTERVAL seconds
+        self.logged=time()
+        self.clocksize=None #the size the clock is drawn at, WIDTH until the window is resized
+        self.resize_job=None
+        self.animator=Animator() #moves the dial on between states when animation_fps is set
+        self.frame_cost=0.0 #seconds a frame takes to draw, smoothed
+        self.scrubber=None #time travel, made the first time it is used
+        self.catalog_index=None #the Catalog read from the catalog file, see load_catalog
+        self.targetlist=None #the Listbox of the target list window when it is open
+        self.listed=None #the catalog and names of the targets in it
+        self.events=None #EventEngine, made once the events window is open and the astronomy loaded
+        self.eventlist=None #the Listbox of the events window when it is open
+        self.eventkey=None #what it shows, see list_events
+        self.shown={} #label -> the text it shows, see show_text
+        self.update_job=None #the after of the next time_update
+
+        self.master=master
+        self.master.title("Observatory Clock, Version %s"%str(version))
+        self.gencanvas()
+
+
+        #astronomy is done off the GUI thread, even loading it
+        threading.Thread(target=self.load_astronomy,daemon=True).start()
+        self.load_catalog()
+        self.time_update() #runs the initial clock generation
+        self.bindings() #initialize keybindings
+
+
+        menu = tk.Menu(master)
+        master.config(menu=menu)
+
+        filemenu = tk.Menu(menu)
+        menu.add_cascade(label="File", menu=filemenu)
+        filemenu.add_command(label="Set Preferences",command=self.setobs)
+        self.refsidereal=tk.BooleanVar(value=self.sidereal_mode == "astropy")
+        filemenu.add_checkbutton(label="Reference (astropy) Sidereal Time",variable=self.refsidereal,command=self.set_sidereal_mode)
+        filemenu.add_separator()
+        filemenu.add_command(label="Exit", command=self._quit)
+
+        timemenu = tk.Menu(menu)
+        menu.add_cascade(label="Time", menu=timemenu)
+        timemenu.add_command(label="Upcoming Events", command=self.eventwindow)
+        timemenu.add_command(label="Time Travel Slider", command=self.timeslider)
+        timemenu.add_command(label="Back an Hour", accelerator="Left", command=lambda: self.scrub("jump",-3600))
+        timemenu.add_command(label="Forward an Hour", accelerator="Right", command=lambda: self.scrub("jump",3600))
+        timemenu.add_command(label="Back a Day", accelerator="Down", command=lambda: self.scrub("jump",-86400))
+        timemenu.add_command(label="Forward a Day", accelerator="Up", command=lambda: self.scrub("jump",86400))
+        timemenu.add_command(label="Faster", accelerator="+", command=lambda: self.scrub("faster"))
+        timemenu.add_command(label="Slower", accelerator="-", command=lambda: self.scrub("slower"))
+        timemenu.add_command(label="Pause", accelerator="Space", command=lambda: self.scrub("pause"))
+        timemenu.add_command(label="Now", accelerator="Escape", command=lambda: self.scrub("live"))
+
+        targetmenu = tk.Menu(menu)
+        menu.add_cascade(label="Targets", menu=targetmenu)
+        targetmenu.add_command(label="Load Catalog", command=self.choose_catalog)
+        targetmenu.add_command(label="Target List", command=self.targetwindow)
+        targetmenu.add_command(label="No Catalog", command=lambda: self.saveprefs(dict(self.prefs,catalog=None)))
+
+        self.sitemenu = tk.Menu(menu)
+        menu.add_cascade(label="Sites", menu=self.sitemenu)
+        self.sitevar=tk.StringVar(value=self.sitename)
+        self.build_sites_menu()
+
+        about = tk.Menu(menu)
+        menu.add_cascade(label="About", menu=about)
+        about.add_command(label="About", command=self.about)
+
+
+
+    def bindings(self):
+        #keyboard shortcuts
+        self.master.bind('q', lambda event: self._quit())
+        self.master.bind('i', lambda event: self.toggle_overlay())
+        self.master.bind('<Configure>', self.on_configure)
+        for key,action in (('<Left>',("jump",-3600)),('<Right>',("jump",3600)),('<Down>',("jump",-86400)),
+                           ('<Up>',("jump",86400)),('+',("faster",)),('=',("faster",)),('-',("slower",)),
+                           ('<space>',("pause",)),('<Escape>',("live",))):
+            self.master.bind(key, lambda event,action=action: self.scrub(*action))
+
+    def gencanvas(self):
+
+        self.HEIGHT=self.WIDTH #force square for circular clock.
+        self.WIDTH2=self.WIDTH/2  #this is done alot, so make it quicker on the computer.
+        self.HEIGHT2=self.HEIGHT/2
+
+        #window gemoetry
+        self.master.geometry('%sx%s'%(int(self.WIDTH+self.WIDTH/2),int(self.HEIGHT+self.HEIGHT/2)))
+        self.master.configure(background="white")
+        # self.master.attributes('-zoomed', True)
+
+        #every label uses one of these, resizing changes them in one place
+        self.normalfont=tkfont.Font(family=self.font, size=self.fontsize)
+        self.boldfont=tkfont.Font(family=self.font, size=self.fontsize, weight="bold")
+
+        # clock canvas
+        self.header = tk.Label(self.master, font=self.boldfont, fg=self.fg1,bg=self.bckgrnd)
+        self.freindly = tk.Label(self.master, font=self.boldfont, fg=self.fg1,bg=self.bckgrnd)
+        self.prefix = tk.Label(self.master, font=self.normalfont, fg=self.fg1,bg=self.bckgrnd)
+
+        self.mil = tk.Label(self.master, font=self.normalfont, fg=self.fg1,bg=self.bckgrnd, justify=tk.LEFT)
+        self.localdatedisp = tk.Label(self.master, font=self.normalfont, fg=self.fg1,bg=self.bckgrnd, justify=tk.LEFT)
+        self.lastdisp = tk.Label(self.master, font=self.normalfont, fg="blue",bg=self.bckgrnd, justify=tk.LEFT)
+
+        self.header2 = tk.Label(self.master, font=self.normalfont, fg=self.fg2,bg=self.bckgrnd, justify=tk.LEFT)
+        self.header2.config(text="UTC")
+        self.utdisp = tk.Label(self.master, font=self.normalfont, fg="red",bg=self.bckgrnd, justify=tk.LEFT)
+        self.utdatedisp = tk.Label(self.master, font=self.normalfont, fg=self.fg2,bg=self.bckgrnd, justify=tk.LEFT)
+        self.jddisp =  tk.Label(self.master, font=self.normalfont, fg=self.fg2,bg=self.bckgrnd, justify=tk.LEFT)
+        self.mjddisp = tk.Label(self.master, font=self.normalfont, fg=self.fg2,bg=self.bckgrnd, justify=tk.LEFT)
+        self.gastdisp = tk.Label(self.master, font=self.normalfont, fg=self.fg2,bg=self.bckgrnd, justify=tk.LEFT)
+
+        self.sr = tk.Label(self.master, font=self.normalfont, fg="green",bg=self.bckgrnd, justify=tk.LEFT)
+        self.ss = tk.Label(self.master, font=self.normalfont, fg="green",bg=self.bckgrnd, justify=tk.LEFT)
+        self.dark = tk.Label(self.master, font=self.normalfont, fg="grey",bg=self.bckgrnd, justify=tk.LEFT)
+        self.moonillumination = tk.Label(self.master, font=self.normalfont, fg="black",bg=self.bckgrnd, justify=tk.LEFT)
+
+        self.textboxlabel=tk.Label(self.master, font=self.normalfont, fg="black",bg=self.bckgrnd, justify=tk.LEFT)
+        self.canvas = tk.Canvas(self.master, width=self.WIDTH, height=self.HEIGHT, bg=self.bckgrnd, highlightthickness=0)
+
+        self.header.grid(row=0,column=0,columnspan=2)
+
+        self.canvas.grid(row=1,column=0,columnspan=2)
+        self.freindly.grid(row=2,column=0,columnspan=2)
+
+        self.mil.grid(row=4,column=0, sticky=tk.W)
+        self.lastdisp.grid(row=5,column=0, sticky=tk.W)
+
+        self.utdisp.grid(row=4,column=1, sticky=tk.W)
+        self.gastdisp.grid(row=5,column=1, sticky=tk.W)
+
+        self.jddisp.grid(row=6,column=0, sticky=tk.W)
+        self.mjddisp.grid(row=6,column=1, sticky=tk.W)
+
+        self.sr.grid(row=7,column=0, sticky=tk.W)
+        self.ss.grid(row=7,column=1, sticky=tk.W)
+
+        self.moonillumination.grid(row=8,column=0, sticky=tk.W)
+        self.dark.grid(row=8,column=1, sticky=tk.W)
+        # self.prefix.grid(row=9,column=0,columnspan=2)
+
+        self.face=ClockFace(self.WIDTH,self.font,self.fontsize,self.bckgrnd,smooth=self.frame_rate() > 0,snap=self.low_power)
+        self.renderer=TkRenderer(self.canvas)
+        self.renderer.sync(self.face.display) #the static face shows straight away
+        self.clocksize=self.WIDTH
+
+    def load_astronomy(self):
+        #Runs in a thread at startup.  Importing astropy, astroplan and suntime
+        #and setting up the site take seconds on a small computer, the static
+        #face is already on screen and the hands appear with the first state.
+        if self.server:
+            from .client import ClockClient
+            worker=ClockClient(self.server,metrics=self.metrics)
+            worker.start()
+            self.worker=worker
+            return
+        from .site import SiteContext
+        from .worker import ClockWorker
+        site=SiteContext(self.sitename,self.latf,self.lonf,self.elevation,self.tz)
+        worker=ClockWorker(site,self.refresh,sidereal_mode=self.sidereal_mode,metrics=self.metrics)
+        worker.until=self.change_clock()
+        worker.start()
+        self.site=site
+        self.worker=worker
+
+    def change_clock(self):
+        #in low power the worker sleeps until the clock would look different
+        if not self.low_power:
+            return None
+        from .lowpower import ChangeClock
+        return ChangeClock(self.clocksize or self.WIDTH,scaled_fontsize(self.fontsize,self.clocksize or self.WIDTH,self.WIDTH))
+
+    def frame_rate(self):
+        #frames a second of the smooth animation, none in low power
+        return 0 if self.low_power else self.animation_fps
+
+    def poll_soon(self):
+        #look for a new state shortly, in low power time_update may be asleep
+        #until the next one was due
+        if self.update_job is not None:
+            self.master.after_cancel(self.update_job)
+        self.update_job=self.master.after(POLL_OFFSET,self.time_update)
+
+    def new_site(self):
+        #the site was changed, before load_astronomy is done it picks it up itself
+        from .site import SiteContext
+        if self.worker is None or self.server:
+            return #a client shows the server's site
+        self.site=SiteContext(self.sitename,self.latf,self.lonf,self.elevation,self.tz)
+        self.worker.set_site(self.site)
+        if self.scrubber is not None:
+            self.scrubber.set_site(self.site)
+        if self.events is not None:
+            self.events.set_site(self.site)
+        self.poll_soon()
+
+    def resize(self):
+        #the fontsize or clock size in the preferences changed
+        self.master.geometry('%sx%s'%(int(self.WIDTH+self.WIDTH/2),int(self.WIDTH+self.WIDTH/2)))
+        self.scale_to(self.WIDTH)
+
+    def on_configure(self,event):
+        #The window was resized.  Fit the clock to it, keeping the proportions
+        #of the window gencanvas makes, once the size stops changing so a drag
+        #does not rescale the clock for every pixel.
+        if event.widget is not self.master:
+            return
+        size=max(MIN_SIZE,int(min(event.width,event.height/1.5)))
+        if size == self.clocksize:
+            return
+        if self.resize_job is not None:
+            self.master.after_cancel(self.resize_job)
+        self.resize_job=self.master.after(RESIZE_DELAY,self.scale_to,size)
+
+    def scale_to(self,size):
+        #Draw the clock size pixels across, the fonts in proportion.  The
+        #canvas items are moved and rescaled, not made again, and the labels
+        #follow the two named fonts.
+        self.resize_job=None
+        self.clocksize=size
+        fontsize=scaled_fontsize(self.fontsize,size,self.WIDTH)
+        self.normalfont.configure(size=fontsize)
+        self.boldfont.configure(size=fontsize)
+        self.canvas.config(width=size,height=size)
+        self.face.resize(size,fontsize)
+        if self.overlay:
+            self.face.show_overlay(self.metrics.text())
+        self.renderer.sync(self.face.display)
+        if self.worker is not None and not self.server:
+            self.worker.until=self.change_clock()
+
+    # Update clock display time
+    def time_update(self):
+        #the worker thread does the calculations, here we only show its newest
+        #ClockState once it is different from the one on display.
+        state=self.worker.latest if self.worker is not None else None
+        if self.scrubbing():
+            start=perf_counter()
+            self.show_state(self.scrubber.state())
+            self.metrics.add("scrub",perf_counter()-start)
+            delay=int(1000/self.animation_fps) if self.animation_fps else SCRUB_DELAY
+        else:
+            if state is not None and state is not self.state:
+                self.show_state(state)
+            due=getattr(self.worker,"due",None)
+            if self.frame_rate() and self.state is not None:
+                delay=self.animate()
+            elif self.low_power and due is not None:
+                delay=max(poll_delay(),int((due-time())*1000)+POLL_OFFSET) #asleep until the worker's next state
+            else:
+                delay=poll_delay()
+        if self.metrics_log and time()-self.logged >= LOG_INTERVAL:
+            self.logged=time()
+            try:
+                self.metrics.log(self.metrics_log)
+            except Exception as err:
+                print("failed to write metrics: %s"%err)
+        if time()-self.watched >= WATCH_INTERVAL:
+            self.watched=time()
+            if self.watcher.changed():
+                self.apply_prefs(load(self.prefs_file))
+        self.update_job=self.master.after(delay, self.time_update) #cheap check, only redraws when the worker has a new state or to animate
+
+    def animate(self):
+        #Draw one frame of the smooth animation and return the ms to the next.
+        #The frame rate drops below animation_fps if drawing (Tk's painting
+        #included) would take more than animation_cpu of the GUI thread.
+        start=perf_counter()
+        self.face.update(self.animator.frame())
+        if self.overlay:
+            self.face.show_overlay(self.metrics.text())
+        self.renderer.sync(self.face.display)
+        self.canvas.update_idletasks() #paint now so it is part of the cost
+        cost=perf_counter()-start
+        self.metrics.add("frame",cost)
+        self.frame_cost=0.9*self.frame_cost+0.1*cost
+        return max(1,int(1000*max(1./self.frame_rate(),self.frame_cost/self.animation_cpu)))
+
+    def toggle_overlay(self):
+        self.overlay=not self.overlay
+        self.face.show_overlay(self.metrics.text() if self.overlay else None)
+        self.renderer.sync(self.face.display)
+
+    def scrubbing(self):
+        return self.scrubber is not None and self.scrubber.active
+
+    def scrub(self,action,*args):
+        #time travel: call action (jump, goto, faster, slower, pause or live)
+        #on the Scrubber, which is made the first time, once the astronomy is loaded
+        if self.scrubber is None:
+            if self.worker is None or self.server:
+                return #a client has no astronomy of its own to travel with
+            from .scrub import Scrubber
+            self.scrubber=Scrubber(self.site,self.worker.ephemeris)
+        getattr(self.scrubber,action)(*args)
+        self.poll_soon()
+
+    def timeslider(self):
+        #a window with a slider to drag the clock up to SLIDER_DAYS either side of now
+        t=tk.Toplevel(self.master)
+        t.wm_title("Time Travel")
+        tk.Label(t,text="Hours from now.  The arrow keys step by hours (left/right) and days (up/down),\n+ and - change the playback speed, space pauses and Escape returns to now.").pack()
+        self.slider=tk.Scale(t,from_=-SLIDER_DAYS*24,to=SLIDER_DAYS*24,resolution=0.25,orient=tk.HORIZONTAL,length=600,
+                             command=lambda value: self.scrub("goto",time()+float(value)*3600))
+        self.slider.pack()
+        tk.Button(t,text="Now",command=lambda: (self.slider.set(0),self.scrub("live"))).pack(pady=10)
+
+    def eventwindow(self):
+        #a window listing the next rise, transit and set of each body and the next moon quarters
+        t=tk.Toplevel(self.master)
+        t.wm_title("Upcoming Events")
+        self.eventlist=tk.Listbox(t,width=44,height=32,font=self.normalfont)
+        self.eventlist.pack(fill=tk.BOTH,expand=True)
+        self.eventkey=None
+        if self.state is not None:
+            self.list_events(self.state)
+
+    def list_events(self,state):
+        #Refill the events window when an event has passed or the minute
+        #changes, the times to go are to the minute.  Finding the events is the
+        #EventEngine's, in the background; this only reads its queue.
+        if self.eventlist is None or not self.eventlist.winfo_exists():
+            return
+        if self.events is None and self.worker is not None and not self.server:
+            from .events import EventEngine
+            self.events=EventEngine(self.site,self.worker.ephemeris)
+        events=self.events.upcoming(state.jd) if self.events is not None else None
+        key=(events,state.local.replace(second=0,microsecond=0))
+        if key == self.eventkey:
+            return
+        self.eventkey=key
+        self.eventlist.delete(0,tk.END)
+        if self.events is None:
+            self.eventlist.insert(tk.END,"not available in a client" if self.server else "waiting for the astronomy")
+        elif not events:
+            self.eventlist.insert(tk.END,"working them out")
+        for event in events or ():
+            days=event.jd-state.jd
+            when=state.local+timedelta(days=days)
+            left="%dd %02dh"%divmod(int(days*24),24) if days >= 1 else "%dh %02dm"%divmod(int(days*1440),60)
+            self.eventlist.insert(tk.END,"%s  %-8s %-14s in %s"%(when.strftime("%a %H:%M"),event.body,event.kind,left))
+
+    def show_state(self,state):
+        #prints the texts parts of the time and redraws the clock from a ClockState
+        if self.state is not None:
+            self.moonphaseold=self.state.moonphase
+        self.state=state
+        self.local=state.local
+        self.ut=state.ut
+        self.moonphase=state.moonphase
+        self.riseset=state.riseset
+
+        if self.scrubbing():
+            self.show_text(self.header,"%s  %s"%(state.sitename,self.scrubber.describe()))
+        else:
+            self.show_text(self.header,"%s"%state.sitename)
+        #in low power to the minute, so the labels only change once a minute
+        clock="%H:%M" if self.low_power else "%H:%M:%S"
+        sidereal=(lambda t: hms(t)[:5]) if self.low_power else hms
+        day="%0.3f" if self.low_power else "%0.4f"
+        LT=self.local.strftime(clock)
+        LD=self.local.strftime("%Y%m%d")
+        JD=state.jd
+        MJD=state.mjd
+        UT=self.ut.utc.strftime(clock)
+        UD=self.ut.utc.strftime("%Y%m%d")
+        GAST=state.gast
+        LAST=state.last
+
+        prefixl=self.ut.strftime("%Y%m%d")
+
+        freindlyt=self.local.strftime("%A, %d. %B %Y %I:%M%p")
+        self.show_text(self.freindly,freindlyt)
+        self.show_text(self.prefix,"Fileprefix:  "+prefixl)
+
+        self.show_text(self.mil,          "LOCAL: "  +LT)
+        self.show_text(self.lastdisp,     "LST : "  +sidereal(LAST))
+
+        self.show_text(self.utdisp,       "UT  : "  +UT)
+        self.show_text(self.gastdisp,     "GST: "  +sidereal(GAST))
+        self.show_text(self.jddisp,       "JD   : "  +day%JD)
+        self.show_text(self.mjddisp,      "MJD : "  +day%MJD)
+        self.show_text(self.sr,           "\u2609RISE: "  +hhmm(self.riseset.sunrise))
+        self.show_text(self.ss,           "\u2609SET: "  +hhmm(self.riseset.sunset))
+        if self.riseset.astronomical is None:
+            self.show_text(self.dark,     "DARK: none")
+        else:
+            self.show_text(self.dark,     "DARK: "  +'%s-%s'%tuple(hhmm(t) for t in self.riseset.astronomical))
+        if self.moonphase > self.moonphaseold:
+            ww="waxing"
+        elif self.moonphase < self.moonphaseold:
+            ww="waning"
+        else:
+            ww=""
+
+        self.show_text(self.moonillumination,u"Moon Illumination: %0.1f%% %s"%(self.moonphase*100,ww))
+
+        self.face.targets=self.find_targets(state)
+        self.list_targets(state)
+        self.list_events(state)
+
+        if not self.scrubbing():
+            self.animator.push(state)
+            if self.frame_rate():
+                return #animate() draws the dial
+        start=perf_counter()
+        self.face.update(state) #calls the amazing astronomical clock drawing.
+        if self.overlay:
+            self.face.show_overlay(self.metrics.text())
+        self.renderer.sync(self.face.display)
+        self.metrics.add("draw",perf_counter()-start)
+
+    def show_text(self,label,text):
+        #Tk redraws a label on every config, so only the ones that changed
+        if self.shown.get(label) != text:
+            self.shown[label]=text
+            label.config(text=text)
+
+    def load_catalog(self):
+        #read the catalog file in the preferences in a thread, a long one takes a moment
+        self.catalog_index=None
+        if self.catalog:
+            threading.Thread(target=self.read_catalog,args=(self.catalog,),daemon=True).start()
+
+    def read_catalog(self,filename):
+        from .catalog import readcatalog
+        try:
+            catalog=readcatalog(filename)
+        except (OSError,ValueError) as err:
+            print("can't read the catalog %s: %s"%(filename,err))
+            return
+        if filename == self.catalog: #not changed again meanwhile
+            self.catalog_index=catalog
+
+    def choose_catalog(self):
+        filename=fd.askopenfilename(title="Catalog: name, RA, Dec a line")
+        if filename:
+            self.saveprefs(dict(self.prefs,catalog=filename))
+
+    def find_targets(self,state):
+        #(name, ra, dec) of the catalog targets to show for state, nearest the meridian
+        if self.catalog_index is None:
+            return []
+        lst=state.last[0]+state.last[1]/60.+state.last[2]/3600.
+        latitude=self.latf if self.catalog_altitude is not None else None
+        index=self.catalog_index.near_meridian(lst,self.catalog_hours,latitude,self.catalog_altitude,self.catalog_max)
+        return self.catalog_index.targets(index)
+
+    def targetwindow(self):
+        #a window listing the targets on the dial in the order they cross the meridian
+        t=tk.Toplevel(self.master)
+        t.wm_title("Targets")
+        self.targetlist=tk.Listbox(t,width=48,height=20,font=self.normalfont)
+        self.targetlist.pack(fill=tk.BOTH,expand=True)
+        self.listed=None
+        if self.state is not None:
+            self.list_targets(self.state)
+
+    def list_targets(self,state):
+        #refill the target list when other targets are shown
+        if self.targetlist is None or not self.targetlist.winfo_exists():
+            return
+        listed=(self.catalog_index,tuple(name for name,ra,dec in self.face.targets))
+        if listed == self.listed:
+            return
+        self.listed=listed
+        lst=state.last[0]+state.last[1]/60.+state.last[2]/3600.
+        self.targetlist.delete(0,tk.END)
+        if self.catalog_index is None:
+            self.targetlist.insert(tk.END,"no catalog, Targets > Load Catalog" if not self.catalog else "reading %s"%self.catalog)
+        for name,ra,dec in self.face.targets:
+            transit=state.local+timedelta(hours=((ra/15-lst+12)%24-12)/SIDEREAL_RATE)
+            self.targetlist.insert(tk.END,"%-16s %s %+05.1f  transit %s"%(name[:16],hms(split_hours(ra/15))[:5],dec,hhmm(transit)))
+
+    def strdelta(self,delta):
+        secs=delta.total_seconds()
+        days, rem = divmod(secs, 86400)  # Seconds per day: 24 * 60 * 60
+        hours, rem = divmod(rem, 3600)  # Seconds per hour: 60 * 60
+        mins, secs = divmod(rem, 60)
+        H="{:02d}".format(int(hours))
+        M="{:02d}".format(int(mins))
+        S="{:02d}".format(int(secs))
+        return H+":"+M+":"+S
+
+    def set_sidereal_mode(self):
+        #switch between the fast closed form sidereal time and astropy's, and remember it
+        self.saveprefs(dict(self.prefs,sidereal_mode="astropy" if self.refsidereal.get() else "fast"))
+
+    def _quit(self):
+        if self.worker is not None:
+            self.worker.stop()
+        self.master.destroy()  # this is necessary on Windows to prevent
+                        # Fatal Python Error: PyEval_RestoreThread: NULL tstate
+        self.master.quit()     # stops mainloop
+
+
+    def setobs(self):
+        t=tk.Toplevel(self.master,height=600,width=80)
+        t.wm_title("Observatory")
+        tk.Label(t,text="Set Observatory Location\n\nA new display name adds a site, the Sites menu switches between them.\n\n").pack()
+        tk.Label(t,text="Display Name:").pack()
+
+        self.N=tk.StringVar()
+        self.E1=tk.Entry(t,width=50,text=self.N)
+        self.E1.pack()
+        self.N.set(self.sitename)
+
+        self.L1=tk.StringVar()
+        tk.Label(t,text="Latitude:").pack()
+        self.E2=tk.Entry(t,width=50,text=self.L1)
+        self.E2.pack()
+        self.L1.set(str(self.latf))
+
+        self.L2=tk.StringVar()
+        tk.Label(t,text="Longitude:").pack()
+        self.E3=tk.Entry(t,width=50,text=self.L2)
+        self.E3.pack()
+        self.L2.set(str(self.lonf))
+
+        self.Z=tk.StringVar()
+        tk.Label(t,text="Timezone, e.g. America/New_York, blank for the computer's:").pack()
+        self.E6=tk.Entry(t,width=50,text=self.Z)
+        self.E6.pack()
+        self.Z.set(self.tz or "")
+
+        tk.Label(t,text="Set desired fontsize, default is 16pt:").pack()
+        self.F=tk.StringVar()
+        self.E4=tk.Entry(t,width=50,text=self.F)
+        self.E4.pack()
+        self.F.set(self.fontsize)
+
+        tk.Label(t,text="\n\nClock Size, default is 420px:").pack()
+        self.W=tk.StringVar()
+        self.E5=tk.Entry(t,width=50,text=self.W)
+        self.E5.pack()
+        self.W.set(self.WIDTH)
+
+
+        set_button = tk.Button(t, text="Set", command=self.siteupdate)
+        set_button.pack(pady=10)
+
+        reset_button = tk.Button(t, text="Default Values", command=self.setdef)
+        reset_button.pack(pady=10)
+
+    def siteupdate(self):
+        try:
+            latf=float(self.E2.get())
+            lonf=float(self.E3.get())
+            fontsize=int(self.E4.get())
+            WIDTH=int(self.E5.get())
+        except ValueError as err:
+            print("preferences not set, %s"%err)
+            return
+        site=dict(active_site(self.prefs),sitename=self.E1.get().strip(),latf=latf,lonf=lonf,tz=self.E6.get().strip() or None)
+        if not site["sitename"]:
+            print("preferences not set, the site needs a display name")
+            return
+        prefs=dict(self.prefs,fontsize=fontsize,WIDTH=WIDTH)
+        set_site(prefs,site)
+        self.saveprefs(prefs)
+
+    def choose_site(self):
+        self.saveprefs(dict(self.prefs,site=self.sitevar.get()))
+
+    def build_sites_menu(self):
+        self.sitemenu.delete(0,"end")
+        for site in self.prefs["sites"]:
+            self.sitemenu.add_radiobutton(label=site["sitename"],variable=self.sitevar,value=site["sitename"],command=self.choose_site)
+        self.sitevar.set(self.prefs["site"])
+
+    def loadprefs(self):
+        self.prefs=load(self.prefs_file)
+        for key,value in flatten(self.prefs).items():
+            setattr(self,key,value)
+
+    def saveprefs(self,prefs):
+        #save prefs and show them straight away, the watcher then finds nothing new
+        try:
+            prefs=save(prefs,self.prefs_file)
+            self.watcher.saved()
+        except OSError as err:
+            print("failed to save preferences: %s"%err)
+            prefs=validate(prefs)[0]
+        self.apply_prefs(prefs)
+
+    def apply_prefs(self,prefs):
+        #Show new preferences without a restart, redoing only what they change:
+        #the site goes to the worker, a new size or fontsize rebuilds the
+        #window, refresh rates and the sidereal mode are passed to the worker.
+        old=flatten(self.prefs)
+        new=flatten(prefs)
+        self.prefs=prefs
+        for key,value in new.items():
+            setattr(self,key,value)
+        if any(old[key] != new[key] for key in SITE_KEYS):
+            self.new_site()
+        if old["fontsize"] != new["fontsize"] or old["WIDTH"] != new["WIDTH"]:
+            self.resize()
+        if old["catalog"] != new["catalog"]:
+            self.load_catalog()
+        self.face.smooth=self.frame_rate() > 0 #the next state or frame draws it
+        self.face.display.snap=self.low_power
+        if self.worker is not None:
+            if old["low_power"] != new["low_power"] and not self.server:
+                self.worker.until=self.change_clock()
+                self.worker.refresh()
+            if old["refresh"] != new["refresh"]:
+                self.worker.set_refresh(new["refresh"])
+            if old["sidereal_mode"] != new["sidereal_mode"]:
+                self.worker.sidereal_mode=self.sidereal_mode
+                self.worker.refresh()
+        self.refsidereal.set(self.sidereal_mode == "astropy")
+        self.build_sites_menu()
+        self.poll_soon()
+
+    def setdef(self):
+        self.N.set(self.sitename_def)
+        self.L1.set(self.latf_def)
+        self.L2.set(self.lonf_def)
+        self.Z.set("")
+        self.F.set(self.fontsize_def)
+        self.W.set(self.WIDTH_def)
+        self.siteupdate()
+
+    def about(self):
+        t=tk.Toplevel(self.master,height=600,width=80)
+        t.wm_title("About")
+        tk.Label(t,text="Version %s"%version).pack()
+        tk.Label(t,text="Last Updated %s"%UPDATED).pack()
+        tk.Label(t,text="Author: Dr. Joshua Thomas\nthomas.joshd@gmail.com\n thomasjd@alfred.edu\n\nThe 24 hour display has black numbers on the outside for local time.\n\nThe blue numbers on the inner ring change on their own so that the meridian \n(indicated by the hour hand) is pointing to both the current right ascension of \nthe meridian (local sidereal time) and the local civil time.\n\nThe purple and blue hour hands always move together and is color coordinated \nwith the digital displays at the bottom.\n\nThe red hour hand indicates the UT time on the black ring of numbers, and \ncorresponds to the red UT digital display.\n\nThe thin gray lines perpendicular to the purple blue hour hands indicates 6 \nhours of hour angle, approximately the horizon at the celestial equator.\n\nThe planets are indicated by their astronomical symbols, they are approximately \ncolor coded red for Mars, Jupiter and Saturn are the same color as giant \nplanets and Neptune and Uranus are blue for ice giants. Their location is \ntheir right ascension, so it can be read from the blue set of numbers of the \ndial.  Their distances from the center (earth) follow a geocentric-type \napproach, the distances are not scaled and are set a fixed values that looked \nnice. Venus and Mercury are black when inferior to the sun, and red when \nsuperior to the sun.\n\nThe sunset/sunrise times are color coordinated with marks on the dial and the \nnighttime hours are shaded.\n\nThe moon phase can be inferred from the relative position of the Sun, Earth, and\n Moon.  The Earth is at the center of the dial.  Since this is a clock, the \n moon moves clockwise in right ascension. To aid in interpreting phase 1st and \n3rd quarters are marked, new moon is of course when the moon is between the \nsun and earth.").pack()
+
+class Dashboard:
+    #Several observatory clocks in one window, a grid with a ClockFace for each
+    #site, all fed by one DashboardWorker so the work that is the same for every
+    #site is only done once a tick.  UT, GST, JD and the moon are the same
+    #everywhere and are shown once underneath.
+    def __init__(self,master,sites,metrics_log=None,prefs_file=PREFS_FILE):
+        prefs=flatten(load(prefs_file))
+        self.master=master
+        self.sites=sites #dicts from readsites
+        self.bckgrnd='white'
+        self.font="Courier"
+        self.columns=int(math.ceil(math.sqrt(len(sites))))
+        scale=1.0 if len(sites) == 1 else 0.75
+        self.WIDTH=int(prefs["WIDTH"]*scale)
+        self.fontsize=max(8,int(prefs["fontsize"]*scale))
+        self.sidereal_mode=prefs["sidereal_mode"]
+        self.refresh=prefs["refresh"]
+        self.worker=None
+        self.states=None
+        self.metrics=Metrics()
+        self.overlay=False
+        self.metrics_log=metrics_log
+        self.logged=time()
+        self.natural=None #the window's first size, the clocks are WIDTH at it
+        self.clocksize=self.WIDTH
+        self.resize_job=None
+
+        self.master.title("Observatory Clock, Version %s"%str(version))
+        self.master.configure(background=self.bckgrnd)
+        self.normalfont=tkfont.Font(family=self.font, size=self.fontsize)
+        self.boldfont=tkfont.Font(family=self.font, size=self.fontsize, weight="bold")
+        self.cells=[]
+        for i,site in enumerate(sites):
+            frame=tk.Frame(master,bg=self.bckgrnd)
+            frame.grid(row=i//self.columns,column=i%self.columns,padx=5,pady=5)
+            tk.Label(frame,text=site["sitename"],font=self.boldfont,fg="purple",bg=self.bckgrnd).grid(row=0)
+            canvas=tk.Canvas(frame,width=self.WIDTH,height=self.WIDTH,bg=self.bckgrnd,highlightthickness=0)
+            canvas.grid(row=1)
+            times=tk.Label(frame,font=self.normalfont,fg="blue",bg=self.bckgrnd)
+            times.grid(row=2)
+            sun=tk.Label(frame,font=self.normalfont,fg="green",bg=self.bckgrnd)
+            sun.grid(row=3)
+            face=ClockFace(self.WIDTH,self.font,self.fontsize,self.bckgrnd)
+            renderer=TkRenderer(canvas)
+            renderer.sync(face.display)
+            self.cells.append((face,renderer,times,sun,canvas))
+        self.footer=tk.Label(master,font=self.normalfont,fg="red",bg=self.bckgrnd)
+        self.footer.grid(row=(len(sites)-1)//self.columns+1,column=0,columnspan=self.columns)
+
+        threading.Thread(target=self.load_astronomy,daemon=True).start()
+        self.time_update()
+        self.master.bind('q', lambda event: self._quit())
+        self.master.bind('i', lambda event: self.toggle_overlay())
+        self.master.bind('<Configure>', self.on_configure)
+
+    def on_configure(self,event):
+        #like App.on_configure, the clocks grow or shrink with the window
+        if event.widget is not self.master:
+            return
+        if self.natural is None:
+            self.natural=(event.width,event.height)
+            return
+        scale=min(event.width/float(self.natural[0]),event.height/float(self.natural[1]))
+        size=max(MIN_SIZE,int(self.WIDTH*scale))
+        if size == self.clocksize:
+            return
+        if self.resize_job is not None:
+            self.master.after_cancel(self.resize_job)
+        self.resize_job=self.master.after(RESIZE_DELAY,self.scale_to,size)
+
+    def scale_to(self,size):
+        self.resize_job=None
+        self.clocksize=size
+        fontsize=scaled_fontsize(self.fontsize,size,self.WIDTH)
+        self.normalfont.configure(size=fontsize)
+        self.boldfont.configure(size=fontsize)
+        for face,renderer,times,sun,canvas in self.cells:
+            canvas.config(width=size,height=size)
+            face.resize(size,fontsize)
+        if self.overlay:
+            self.cells[0][0].show_overlay(self.metrics.text())
+        for face,renderer,times,sun,canvas in self.cells:
+            renderer.sync(face.display)
+
+    def load_astronomy(self):
+        #in a thread, like App.load_astronomy
+        from .site import SiteContext
+        from .worker import DashboardWorker
+        sites=[SiteContext(s["sitename"],s["latf"],s["lonf"],s.get("elevation",0.0),s.get("tz")) for s in self.sites]
+        worker=DashboardWorker(sites,self.refresh,sidereal_mode=self.sidereal_mode,metrics=self.metrics)
+        worker.start()
+        self.worker=worker
+
+    def time_update(self):
+        states=self.worker.latest if self.worker is not None else None
+        if states is not None and states is not self.states:
+            self.show_states(states)
+        if self.metrics_log and time()-self.logged >= LOG_INTERVAL:
+            self.logged=time()
+            try:
+                self.metrics.log(self.metrics_log)
+            except Exception as err:
+                print("failed to write metrics: %s"%err)
+        self.footer.after(poll_delay(), self.time_update)
+
+    def show_states(self,states):
+        start=perf_counter()
+        self.states=states
+        for state,(face,renderer,times,sun,canvas) in zip(states,self.cells):
+            times.config(text="LOCAL %s  LST %s"%(state.local.strftime("%H:%M:%S"),hms(state.last)))
+            dark="none" if state.riseset.astronomical is None else "%s-%s"%tuple(hhmm(t) for t in state.riseset.astronomical)
+            sun.config(text="\u2609%s-%s  DARK %s"%(hhmm(state.riseset.sunrise),hhmm(state.riseset.sunset),dark))
+            face.update(state)
+        state=states[0]
+        self.footer.config(text="UT %s  GST %s  MJD %0.4f  Moon %0.1f%%"
+                           %(state.ut.utc.strftime("%H:%M:%S"),hms(state.gast),state.mjd,state.moonphase*100))
+        if self.overlay:
+            self.cells[0][0].show_overlay(self.metrics.text())
+        for face,renderer,times,sun,canvas in self.cells:
+            renderer.sync(face.display)
+        self.metrics.add("draw",perf_counter()-start)
+
+    def toggle_overlay(self):
+        #on the first clock, the timings are for the whole dashboard
+        self.overlay=not self.overlay
+        face,renderer=self.cells[0][:2]
+        face.show_overlay(self.metrics.text() if self.overlay else None)
+        renderer.sync(face.display)
+
+    def _quit(self):
+        if self.worker is not None:
+            self.worker.stop()
+        self.master.destroy()
+        self.master.quit()
+
+def run(metrics_log=None,sites=None,prefs_file=PREFS_FILE,server=None):
+    #Begin GUI, a Dashboard when there is a list of sites, server is the
+    #address of a clock started with --serve to show instead of computing
+    root = tk.Tk() #main GUI window
+    if sites:
+        program=Dashboard(root,sites,metrics_log,prefs_file)
+    else:
+        program=App(root,metrics_log,prefs_file,server)
+    root.protocol("WM_DELETE_WINDOW", program._quit)
+    root.mainloop() #lets the GUI run
@@ -0,0 +1,50 @@
+#Low power: the clock is only worked out and redrawn when something it shows
+#would change, for battery and e-ink displays.  The labels go without seconds,
+#so they change on the next minute of the local time (UT turns with it), LST or
+#GST or the next 0.001 of the JD, worked out from the state.  The dial is snapped
+#to whole pixels; whether an item moves a pixel before then is found by moving
+#the state on with the Animator and drawing it on a face of its own.
+import math
+from .animate import Animator, SIDEREAL_RATE
+from .face import ClockFace
+
+LONGEST=60 #seconds, the most the clock waits whatever the labels show
+RESOLUTION=1 #seconds the change is found to when it is a dial item
+
+def label_change(state):
+    #seconds from state until a label without seconds changes
+    local=60-state.local.second-state.local.microsecond/1e6
+    lst=(60-state.last[2])/SIDEREAL_RATE
+    gst=(60-state.gast[2])/SIDEREAL_RATE
+    jd=(math.floor(state.jd*1000)+1-state.jd*1000)*86.4
+    return min(local,lst,gst,jd,LONGEST)
+
+class ChangeClock:
+    #Called with each state from the worker (ClockWorker.until), gives the
+    #seconds until the clock at width pixels would look different.  It runs in
+    #the worker thread with its own face, so it never touches the one on screen.
+    def __init__(self,width,fontsize=16):
+        self.face=ClockFace(width,fontsize=fontsize,snap=True)
+        self.animator=Animator() #the body motion between the states it is given
+
+    def __call__(self,state):
+        self.animator.push(state)
+        end=label_change(state)
+        if not self.moved(end):
+            return end
+        start=0.
+        while end-start > RESOLUTION:
+            middle=(start+end)/2
+            if self.moved(middle):
+                end=middle
+            else:
+                start=middle
+        return end
+
+    def moved(self,seconds):
+        #whether a dial item is a pixel away (or shows other text) seconds
+        #after the state, just before any label change at that moment
+        self.face.update(self.animator.state)
+        self.face.display.take_changes()
+        self.face.update(self.animator.advance(max(seconds-0.001,0)))
+        return bool(self.face.display.take_changes())
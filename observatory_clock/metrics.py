@@ -0,0 +1,99 @@
+#Timings of the running clock, for the instrumentation overlay and the metrics
+#log: how long each stage of a tick takes, the real tick period, how far each
+#tick lands from its wall clock second and how much memory the clock uses.
+import os
+import sys
+import json
+from time import time, perf_counter
+from collections import OrderedDict, deque
+
+def memory_mb():
+    #resident memory of the clock in MB, None where it can't be read
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")/1048576.
+    except Exception:
+        pass
+    try:
+        import resource #no /proc, the peak is the best there is
+        rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss/1048576. if sys.platform == "darwin" else rss/1024.
+    except Exception:
+        return None
+
+def percentile(values,p):
+    values=sorted(values)
+    return values[min(len(values)-1,int(round(p/100.*(len(values)-1))))]
+
+class Metrics:
+    #The last size samples of everything.  The worker and the GUI add to it
+    #from their own threads, appending to a deque is atomic so no lock is needed.
+    def __init__(self,size=300):
+        self.size=size
+        self.stages=OrderedDict() #stage name -> deque of seconds
+        self.periods=deque(maxlen=size) #seconds between tick starts
+        self.drifts=deque(maxlen=size) #seconds each tick started after its target
+        self.last_start=None
+        self.memory_start=None #taken at the second tick, once everything is loaded
+
+    def add(self,stage,seconds):
+        if stage not in self.stages:
+            self.stages[stage]=deque(maxlen=self.size)
+        self.stages[stage].append(seconds)
+
+    def lap(self):
+        #a function that adds the time since the last call (or since lap()) to a stage
+        last=[perf_counter()]
+        def lap(stage):
+            now=perf_counter()
+            self.add(stage,now-last[0])
+            last[0]=now
+        return lap
+
+    def tick(self,target=None):
+        #a tick is starting; target is the wall clock time it was meant to, None
+        #when it was started early by a refresh
+        now=time()
+        if self.last_start is not None:
+            self.periods.append(now-self.last_start)
+            if self.memory_start is None:
+                self.memory_start=memory_mb()
+        self.last_start=now
+        if target is not None:
+            self.drifts.append(now-target)
+
+    def summary(self):
+        #everything as plain numbers, times in ms and memory in MB
+        out={"time":time(),"stages":OrderedDict()}
+        for stage,values in list(self.stages.items()):
+            values=list(values)
+            if values:
+                out["stages"][stage]={"p50":percentile(values,50)*1000,"p99":percentile(values,99)*1000,
+                                      "max":max(values)*1000}
+        for name,values in (("period",list(self.periods)),("drift",list(self.drifts))):
+            if values:
+                out[name]={"last":values[-1]*1000,"p50":percentile(values,50)*1000,
+                           "max":max(values,key=abs)*1000}
+        memory=memory_mb()
+        if memory is not None:
+            out["memory"]=memory
+            if self.memory_start is not None:
+                out["memory_growth"]=memory-self.memory_start
+        return out
+
+    def text(self):
+        #the summary as a few short lines for the overlay
+        s=self.summary()
+        lines=["%-8s %6.2f %6.2f ms"%(stage,v["p50"],v["p99"]) for stage,v in s["stages"].items()]
+        if "period" in s:
+            lines.append("period  %7.1f ms"%s["period"]["last"])
+        if "drift" in s:
+            lines.append("drift   %+6.1f ms (max %+0.1f)"%(s["drift"]["last"],s["drift"]["max"]))
+        if "memory" in s:
+            lines.append("memory  %6.1f MB (%+0.1f)"%(s["memory"],s.get("memory_growth",0)))
+        return "stage     p50    p99\n"+"\n".join(lines)
+
+    def log(self,filename):
+        #append the summary to filename as one line of JSON
+        with open(filename,"a") as f:
+            f.write(json.dumps(self.summary())+"\n")
@@ -0,0 +1,234 @@
+import os
+import json
+import math
+
+PREFS_FILE="settings.json"
+LEGACY_FILE="settings.par" #the old one value per line format, read once if there is no PREFS_FILE
+
+#What settings.json may hold.  Each entry is (type, default, check) where check
+#is None, a (minimum, maximum) pair or a tuple of the allowed values.  A default
+#of None means the setting is optional, except that a site without a good
+#sitename, latf and lonf is left out.
+SITE_SCHEMA={
+    "sitename":(str,None,None),
+    "latf":(float,None,(-90.,90.)), # your latitude in decimal degrees
+    "lonf":(float,None,(-180.,180.)), # your longitude in decimal degrees West is negative
+    "tz":(str,None,None), #timezone name, e.g. America/New_York, None is the computer's
+    "elevation":(float,0.0,(-500.,9000.)), #metres
+    }
+SITE_REQUIRED=("sitename","latf","lonf")
+DEFAULT_SITE={"sitename":"Stull Observatory","latf":42.249999,"lonf":-77.783302,"tz":None,"elevation":0.0}
+SCHEMA={
+    "site":(str,None,None), #which of the sites the clock shows
+    "fontsize":(int,16,(6,72)), #fontsize and WIDTH are inter-related
+    "WIDTH":(int,420,(100,4000)),
+    "sidereal_mode":(str,"fast",("fast","astropy")),
+    "ephemeris":(str,None,None), #a prefetched JPL ephemeris such as de440s, None is the built in one
+    "render_size":(int,None,(50,8000)), #--render size, None is WIDTH
+    "animation_fps":(int,0,(0,60)), #frames a second of the smoothly moving dial, 0 moves it once a second
+    "animation_cpu":(float,0.25,(0.01,1.0)), #most of one core the animation may use, it drops frames to stay under
+    "catalog":(str,None,None), #a file of observing targets, name, RA, Dec a line, to mark on the dial
+    "catalog_hours":(float,2.0,(0.,12.)), #the targets shown are within this many hours of the meridian
+    "catalog_altitude":(float,None,(-90.,90.)), #and at least this many degrees up, None for no horizon test
+    "catalog_max":(int,50,(1,1000)), #most targets drawn and listed, the nearest the meridian
+    "low_power":(bool,False,None), #work out and redraw the clock only when what it shows changes, see lowpower.py
+    }
+REFRESH_KEYS=("sidereal","dut1","bodies","moon") #seconds between updates of each, see worker.REFRESH
+REFRESH_MIN=1 #seconds, the worker ticks at the smallest refresh and the clock shows seconds
+SITE_KEYS=tuple(SITE_SCHEMA)
+
+def check(schema,key,value,problems,where):
+    #value if it fits schema[key], otherwise the default and a note in problems
+    kind,default,limits=schema[key]
+    if value is None and default is None:
+        return None
+    try:
+        if isinstance(value,float) and not math.isfinite(value):
+            raise ValueError("not a finite number")
+        if kind is int and (isinstance(value,bool) or int(value) != value):
+            raise ValueError("not a whole number")
+        if kind is str and not isinstance(value,str):
+            raise ValueError("not text")
+        if kind is bool and not isinstance(value,bool):
+            raise ValueError("not true or false")
+        value=kind(value)
+        if isinstance(limits,tuple) and len(limits) == 2 and not isinstance(limits[0],str):
+            if not limits[0] <= value <= limits[1]:
+                raise ValueError("outside %s to %s"%limits)
+        elif limits is not None and value not in limits:
+            raise ValueError("not one of %s"%", ".join(limits))
+    except (TypeError,ValueError,OverflowError) as err: #OverflowError: int() of Infinity or 1e400, valid JSON
+        problems.append("%s%s=%r is %s, %s"%(where,key,value,err,"ignored" if default is None else "using %r"%default))
+        return default
+    return value
+
+def validate(raw):
+    #Clean preferences from raw (e.g. read from settings.json) and a list of
+    #the problems found.  Every setting is there afterwards, bad or missing
+    #ones have their defaults, and "site" names one of the "sites".
+    problems=[]
+    if not isinstance(raw,dict):
+        problems.append("expected a JSON object, using the defaults")
+        raw={}
+    prefs={}
+    for key in SCHEMA:
+        prefs[key]=check(SCHEMA,key,raw.get(key,SCHEMA[key][1]),problems,"")
+    prefs["refresh"]={}
+    refresh=raw.get("refresh",{})
+    for key,value in (refresh.items() if isinstance(refresh,dict) else ()):
+        if key not in REFRESH_KEYS:
+            problems.append("refresh.%s is not one of %s, ignored"%(key,", ".join(REFRESH_KEYS)))
+        elif isinstance(value,bool) or not isinstance(value,(int,float)) or not math.isfinite(value):
+            problems.append("refresh.%s=%r is not a number of seconds, ignored"%(key,value))
+        elif value < REFRESH_MIN:
+            problems.append("refresh.%s=%r is less than %s s, ignored"%(key,value,REFRESH_MIN))
+        else:
+            prefs["refresh"][key]=value
+    prefs["sites"]=[]
+    sites=raw.get("sites") or []
+    if not isinstance(sites,list):
+        problems.append("sites=%r is not a list of sites, ignored"%(sites,))
+        sites=[]
+    for i,site in enumerate(sites):
+        if not isinstance(site,dict):
+            problems.append("sites[%d] is not an object, ignored"%i)
+            continue
+        where="sites[%d]."%i
+        clean={key:check(SITE_SCHEMA,key,site.get(key,SITE_SCHEMA[key][1]),problems,where) for key in SITE_SCHEMA}
+        for key in site:
+            if key not in SITE_SCHEMA:
+                problems.append("%s%s is not a site setting, ignored"%(where,key))
+        if None in [clean[key] for key in SITE_REQUIRED]:
+            problems.append("sites[%d] needs a good %s, the site is ignored"%(i,", ".join(SITE_REQUIRED)))
+            continue
+        if clean["sitename"] in [s["sitename"] for s in prefs["sites"]]:
+            problems.append("%ssitename %r is used twice, ignored"%(where,clean["sitename"]))
+            continue
+        prefs["sites"].append(clean)
+    if not prefs["sites"]:
+        prefs["sites"].append(dict(DEFAULT_SITE))
+    if prefs["site"] not in [s["sitename"] for s in prefs["sites"]]:
+        if "site" in raw:
+            problems.append("site %r is not in sites, using %r"%(prefs["site"],prefs["sites"][0]["sitename"]))
+        prefs["site"]=prefs["sites"][0]["sitename"]
+    for key in raw:
+        if key not in SCHEMA and key not in ("sites","refresh"):
+            problems.append("%s is not a setting, ignored"%key)
+    return prefs,problems
+
+def readlegacy(filename=LEGACY_FILE):
+    #the old settings.par, one per line: site name, latitude, longitude,
+    #fontsize and clock size, as raw preferences for validate()
+    raw={}
+    site={}
+    with open(filename) as dataout:
+        for i,line in enumerate(dataout):
+            key=("sitename","latf","lonf","fontsize","WIDTH")[i] if i < 5 else None
+            if key in ("sitename",):
+                site[key]=line.strip()
+            elif key in ("latf","lonf"):
+                site[key]=float(line.strip())
+            elif key:
+                raw[key]=int(line.strip())
+    if site:
+        raw["sites"]=[site]
+        raw["site"]=site.get("sitename")
+    return raw
+
+def load(filename=PREFS_FILE,legacy=LEGACY_FILE):
+    #The preferences in filename, or in the old settings.par when there is no
+    #filename yet, validated.  Problems are printed, not hidden, and the bad
+    #values replaced by their defaults.
+    raw={}
+    try:
+        if os.path.exists(filename):
+            with open(filename) as f:
+                raw=json.load(f)
+        elif legacy and os.path.exists(legacy):
+            raw=readlegacy(legacy)
+            filename=legacy
+    except (OSError,ValueError) as err:
+        print("can't read %s, using the defaults: %s"%(filename,err))
+    prefs,problems=validate(raw)
+    for problem in problems:
+        print("%s: %s"%(filename,problem))
+    return prefs
+
+def save(prefs,filename=PREFS_FILE):
+    #write the preferences, validated, replacing the file in one step so a
+    #watcher never reads half of it
+    prefs,problems=validate(prefs)
+    for problem in problems:
+        print("not saved as given: %s"%problem)
+    with open(filename+".tmp","w") as f:
+        json.dump(prefs,f,indent=1)
+    os.replace(filename+".tmp",filename)
+    return prefs
+
+def active_site(prefs):
+    for site in prefs["sites"]:
+        if site["sitename"] == prefs["site"]:
+            return site
+    return prefs["sites"][0]
+
+def set_site(prefs,site):
+    #make site (a dict with SITE_KEYS) the active one, replacing a site of the same name
+    prefs["sites"]=[s for s in prefs["sites"] if s["sitename"] != site["sitename"]]+[dict(site)]
+    prefs["site"]=site["sitename"]
+
+def flatten(prefs):
+    #the active site's settings and all of the options in one dict, the way
+    #the clock has always used them: sitename, latf, lonf, fontsize, WIDTH...
+    flat={key:value for key,value in prefs.items() if key not in ("site","sites")}
+    flat.update(active_site(prefs))
+    return flat
+
+def readprefs(filename=PREFS_FILE):
+    return flatten(load(filename))
+
+#default preferences, settings.json overrides them
+DEFAULTS=flatten(validate({})[0])
+
+class PrefsWatcher:
+    #Notices when the preferences file changes, whether the clock saved it or
+    #someone edited it, so the clock can reload it without restarting.
+    def __init__(self,filename=PREFS_FILE):
+        self.filename=filename
+        self.stamp=self.mtime()
+
+    def mtime(self):
+        try:
+            return os.path.getmtime(self.filename)
+        except OSError:
+            return None
+
+    def changed(self):
+        stamp=self.mtime()
+        if stamp != self.stamp:
+            self.stamp=stamp
+            return True
+        return False
+
+    def saved(self):
+        #the clock wrote the file itself, that is not a change to reload
+        self.stamp=self.mtime()
+
+def readsites(filename):
+    #Sites for the dashboard, one per line: name, latitude, longitude and
+    #optionally a timezone name such as America/Santiago.  Blank lines and
+    #lines starting with # are skipped, as are lines that can't be read.
+    sites=[]
+    with open(filename) as f:
+        for line in f:
+            line=line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields=[field.strip() for field in line.split(",")]
+            try:
+                site={"sitename":fields[0],"latf":float(fields[1]),"lonf":float(fields[2]),
+                      "tz":fields[3] if len(fields) > 3 and fields[3] else None}
+            except (IndexError,ValueError):
+                print("skipping site line %r, expected name, latitude, longitude[, timezone]"%line)
+                continue
+            sites.append(site)
+    return sites
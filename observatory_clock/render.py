@@ -0,0 +1,213 @@
+import math
+from collections import OrderedDict
+
+class Item:
+    #One drawing primitive.  kind is "line", "text", "oval" or "arc"; coords and
+    #options follow the Tk canvas (fill, outline, width, arrow, text, font,
+    #start, extent) so TkRenderer can pass them straight through.
+    def __init__(self,kind,coords,options,hidden=False):
+        self.kind=kind
+        self.coords=tuple(coords)
+        self.options=dict(options)
+        self.hidden=hidden
+
+class DisplayList:
+    #Backend-neutral, retained list of the clock's items in stacking order,
+    #keyed by a stable tag.  Items that change are remembered until a renderer
+    #takes the changes, so a Tk canvas only has to touch what moved.  With
+    #snap the coordinates are rounded to whole pixels, so an item only counts
+    #as moved when it moves a pixel.
+    def __init__(self,width,height,background="white",snap=False):
+        self.width=width
+        self.height=height
+        self.background=background
+        self.snap=snap
+        self.items=OrderedDict()
+        self.changed=set()
+
+    def add(self,tag,kind,coords,hidden=False,**options):
+        self.items[tag]=Item(kind,coords,options,hidden)
+        self.changed.add(tag)
+
+    def move(self,tag,*coords,**options):
+        #new coordinates and/or options for an item, which is made visible
+        item=self.items[tag]
+        changed=item.hidden
+        item.hidden=False
+        if self.snap:
+            coords=[round(c) for c in coords]
+        if coords and tuple(coords) != item.coords:
+            item.coords=tuple(coords)
+            changed=True
+        for key,value in options.items():
+            if item.options.get(key) != value:
+                item.options[key]=value
+                changed=True
+        if changed:
+            self.changed.add(tag)
+
+    def place(self,tag,*coords,**options):
+        #like move, but a hidden item stays hidden, for resizing
+        item=self.items[tag]
+        hidden=item.hidden
+        self.move(tag,*coords,**options)
+        item.hidden=hidden
+
+    def resize(self,width,height):
+        self.width=width
+        self.height=height
+
+    def hide(self,*tags):
+        for tag in tags:
+            if not self.items[tag].hidden:
+                self.items[tag].hidden=True
+                self.changed.add(tag)
+
+    def take_changes(self):
+        changed=self.changed
+        self.changed=set()
+        return changed
+
+class TkRenderer:
+    #Keeps a tk.Canvas in step with a DisplayList.  Items are created once, in
+    #stacking order, and afterwards only the ones that changed are moved with
+    #coords/itemconfig.
+    def __init__(self,canvas):
+        self.canvas=canvas
+        self.ids={}
+
+    def sync(self,display):
+        changed=display.take_changes()
+        for tag,item in display.items.items():
+            if tag not in changed:
+                continue
+            state="hidden" if item.hidden else "normal"
+            if tag not in self.ids:
+                create=getattr(self.canvas,"create_"+item.kind)
+                self.ids[tag]=create(*item.coords, state=state, tags=tag, **item.options)
+            else:
+                self.canvas.coords(self.ids[tag],*item.coords)
+                self.canvas.itemconfig(self.ids[tag], state=state, **item.options)
+
+def svg_color(color):
+    return color if color else "none"
+
+def text_anchor(anchor):
+    #a Tk text anchor (center, n, ne, e, ... nw) as (horizontal, vertical):
+    #"left", "middle" or "right" and "top", "middle" or "bottom" of the text
+    #at its coordinates
+    if not anchor or anchor == "center":
+        return "middle","middle"
+    horizontal="left" if "w" in anchor else "right" if "e" in anchor else "middle"
+    vertical="top" if anchor.startswith("n") else "bottom" if anchor.startswith("s") else "middle"
+    return horizontal,vertical
+
+SVG_ANCHOR={"left":"start","middle":"middle","right":"end"}
+SVG_BASELINE={"top":"text-before-edge","middle":"central","bottom":"text-after-edge"}
+PIL_ANCHOR={"left":"l","middle":"m","right":"r","top":"a","bottom":"d"}
+LINE_SPACING=1.2 #of the font size, between the lines of a text
+
+def render_svg(display):
+    #the display list as an SVG document (a string), hidden items are skipped
+    out=['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">'
+         %(display.width,display.height,display.width,display.height),
+         '<rect width="100%%" height="100%%" fill="%s"/>'%display.background]
+    arrows=set()
+    for item in display.items.values():
+        if item.hidden:
+            continue
+        o=item.options
+        c=item.coords
+        if item.kind == "line":
+            color=svg_color(o.get("fill","black"))
+            marker=""
+            if o.get("arrow") == "last":
+                marker=' marker-end="url(#arrow-%s)"'%color.lstrip("#")
+                arrows.add(color)
+            out.append('<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" stroke="%s" stroke-width="%s"%s/>'
+                       %(c[0],c[1],c[2],c[3],color,o.get("width",1),marker))
+        elif item.kind == "text":
+            #placed by its anchor like Tk, a text of several lines as one tspan
+            #a line, the block moved up by the lines below the anchor
+            font,size=o.get("font",("Courier",16))[:2]
+            horizontal,vertical=text_anchor(o.get("anchor"))
+            lines=str(o.get("text","")).replace("&","&amp;").replace("<","&lt;").split("\n")
+            step=size*4/3.*LINE_SPACING #points to pixels
+            y=c[1]-step*(len(lines)-1)*{"top":0,"middle":0.5,"bottom":1}[vertical]
+            spans="".join('<tspan x="%.1f" y="%.1f">%s</tspan>'%(c[0],y+i*step,line) for i,line in enumerate(lines))
+            out.append('<text font-family="%s" font-size="%spt" fill="%s" text-anchor="%s" dominant-baseline="%s" xml:space="preserve">%s</text>'
+                       %(font,size,svg_color(o.get("fill","black")),SVG_ANCHOR[horizontal],SVG_BASELINE[vertical],spans))
+        elif item.kind == "oval":
+            out.append('<ellipse cx="%.1f" cy="%.1f" rx="%.1f" ry="%.1f" fill="%s" stroke="%s" stroke-width="%s"/>'
+                       %((c[0]+c[2])/2,(c[1]+c[3])/2,(c[2]-c[0])/2,(c[3]-c[1])/2,
+                         svg_color(o.get("fill","")),svg_color(o.get("outline","black")),o.get("width",1)))
+        elif item.kind == "arc":
+            #a Tk pieslice, angles in degrees counterclockwise from 3 o'clock
+            cx,cy,rx,ry=(c[0]+c[2])/2,(c[1]+c[3])/2,(c[2]-c[0])/2,(c[3]-c[1])/2
+            start=math.radians(o.get("start",0))
+            extent=o.get("extent",0)
+            end=start+math.radians(extent)
+            out.append('<path d="M%.1f,%.1f L%.1f,%.1f A%.1f,%.1f 0 %d 0 %.1f,%.1f Z" fill="%s" stroke="%s"/>'
+                       %(cx,cy,cx+rx*math.cos(start),cy-ry*math.sin(start),rx,ry,int(extent%360 > 180),
+                         cx+rx*math.cos(end),cy-ry*math.sin(end),svg_color(o.get("fill","")),svg_color(o.get("outline","black"))))
+    defs=['<marker id="arrow-%s" viewBox="0 0 10 10" refX="8" refY="5" markerWidth="4" markerHeight="4" orient="auto">'
+          '<path d="M0,0 L10,5 L0,10 Z" fill="%s"/></marker>'%(color.lstrip("#"),color) for color in sorted(arrows)]
+    if defs:
+        out.insert(2,"<defs>"+"".join(defs)+"</defs>")
+    out.append("</svg>")
+    return "\n".join(out)
+
+def render_png(display,filename):
+    #Draw the display list to a PNG with Pillow, which is optional and only
+    #needed for this; SVG output needs nothing extra.
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise RuntimeError("PNG output needs Pillow (pip install pillow), or write .svg instead")
+    img=Image.new("RGB",(int(display.width),int(display.height)),display.background)
+    draw=ImageDraw.Draw(img)
+    fonts={}
+    for item in display.items.values():
+        if item.hidden:
+            continue
+        o=item.options
+        c=item.coords
+        if item.kind == "line":
+            color=o.get("fill","black")
+            width=int(o.get("width",1))
+            draw.line(c,fill=color,width=width)
+            if o.get("arrow") == "last":
+                a=math.atan2(c[3]-c[1],c[2]-c[0])
+                size=4+2*width
+                draw.polygon([(c[2],c[3]),
+                              (c[2]-size*math.cos(a-0.4),c[3]-size*math.sin(a-0.4)),
+                              (c[2]-size*math.cos(a+0.4),c[3]-size*math.sin(a+0.4))],fill=color)
+        elif item.kind == "text":
+            size=int(o.get("font",("Courier",16))[1]*4/3) #points to pixels
+            if size not in fonts:
+                try:
+                    fonts[size]=ImageFont.truetype("DejaVuSans.ttf",size)
+                except OSError:
+                    fonts[size]=ImageFont.load_default()
+            horizontal,vertical=text_anchor(o.get("anchor"))
+            draw.text(c,str(o.get("text","")),fill=o.get("fill","black"),font=fonts[size],
+                      anchor=PIL_ANCHOR[horizontal]+PIL_ANCHOR[vertical],align=o.get("justify","left"),
+                      spacing=int(size*(LINE_SPACING-1)))
+        elif item.kind == "oval":
+            draw.ellipse(c,fill=o.get("fill") or None,outline=o.get("outline","black") or None,width=int(o.get("width",1)))
+        elif item.kind == "arc":
+            start,extent=o.get("start",0),o.get("extent",0)
+            if extent:
+                draw.pieslice(c,-(start+extent),-start,fill=o.get("fill") or None,outline=o.get("outline","black") or None)
+    img.save(filename)
+
+def render_file(state,filename,width=420,font="Courier",fontsize=16):
+    #draw one ClockState to an .svg or .png file without any display
+    from .face import ClockFace
+    face=ClockFace(width,font,fontsize)
+    face.update(state)
+    if filename.lower().endswith(".png"):
+        render_png(face.display,filename)
+    else:
+        with open(filename,"w") as f:
+            f.write(render_svg(face.display))
@@ -0,0 +1,110 @@
+#Time travel: the clock at any moment before or after now, fast enough to drag
+#through hours or days or play back at many times real time.  The body
+#positions come from an EphemerisTable covering a window around the scrub
+#position, rebuilt in the background as the position nears its edge (after a
+#jump past the window the last positions stand in until it is built).  The
+#moon illumination is worked out from those positions and sunrise/sunset are
+#cached per day.  Nothing calls get_body per frame.
+from time import time
+from datetime import datetime,timezone
+import astropy.units as u
+from .sidereal import split_hours
+from .ephemeris import Ephemeris, EphemerisTable, grid_covers
+from .state import make_state, greenwich_sidereal, get_dut1
+from .sweep import moon_illumination
+from . import data
+
+#playback speeds in seconds of clock per second, negative runs backwards
+SPEEDS=(-86400,-3600,-600,-60,-1,0,1,60,600,3600,86400)
+
+class Scrubber:
+    #The moment shown is position(), which runs on from where it was put at
+    #speed times real time.  It is live (active is False) when that is now at
+    #normal speed.
+    def __init__(self,site,ephemeris=None,step=20*u.min,span=3*u.day):
+        data.use_cache() #a rebuild must not wait on a download
+        self.site=site
+        self.table=EphemerisTable(ephemeris or Ephemeris(),step,span)
+        self.margin=span.to_value(u.day)/4 #rebuild when the position is this close to an end
+        self.dut1={} #UT1-UTC by MJD day
+        self.eph=None #the last body positions
+        self.live()
+
+    def live(self):
+        #back to now, at normal speed
+        self.start=time()
+        self.stamp=self.start
+        self.speed=1
+        self.paused=1 #the speed to go back to from a pause
+
+    @property
+    def active(self):
+        return self.speed != 1 or abs(self.position()-time()) > 1
+
+    def position(self,now=None):
+        #unix time shown at real time now
+        if now is None:
+            now=time()
+        return self.start+self.speed*(now-self.stamp)
+
+    def goto(self,unix):
+        self.start=unix
+        self.stamp=time()
+
+    def jump(self,seconds):
+        self.goto(self.position()+seconds)
+
+    def set_speed(self,speed):
+        self.goto(self.position())
+        self.speed=speed
+
+    def faster(self):
+        self.set_speed(min([s for s in SPEEDS if s > self.speed] or [SPEEDS[-1]]))
+
+    def slower(self):
+        self.set_speed(max([s for s in SPEEDS if s < self.speed] or [SPEEDS[0]]))
+
+    def pause(self):
+        #stop the clock where it is, or carry on at the speed it had
+        if self.speed:
+            self.paused=self.speed
+            self.set_speed(0)
+        else:
+            self.set_speed(self.paused)
+
+    def set_site(self,site):
+        self.site=site
+        self.dut1.clear()
+        self.eph=None
+
+    def bodies(self,ut):
+        #from the table, which is rebuilt around ut before ut gets to its ends
+        grid=self.table.grid
+        if grid is None or grid.location != ut.location or not grid.jd[0]+self.margin <= ut.jd <= grid.jd[-1]-self.margin:
+            self.table.build_background(ut-self.table.span/2,ut.location)
+        if grid_covers(grid,ut):
+            self.eph=self.table.interpolate(ut,grid)
+        elif self.eph is None or not self.table.building:
+            self.eph=self.table.ephemeris.compute(ut) #a direct pass takes tens of ms, only when there is nothing else
+        return self.eph
+
+    def state(self,now=None):
+        #the ClockState at position(now)
+        site=self.site
+        utc=datetime.fromtimestamp(self.position(now),timezone.utc)
+        ut=site.time(utc)
+        day=int(ut.mjd)
+        if day not in self.dut1:
+            self.dut1[day]=get_dut1(ut)
+        eph=self.bodies(ut)
+        gast=greenwich_sidereal(ut,"fast",self.dut1[day])
+        local=site.local(utc)
+        return make_state(site,ut,local,float(moon_illumination(eph)),site.riseset(local.date()),
+                          split_hours(gast),split_hours(site.local_sidereal(gast)),eph)
+
+    def describe(self):
+        #how far from now and how fast, for the display
+        days,rest=divmod(round(abs(self.position()-time())/60.)*60,86400)
+        sign="-" if self.position() < time() else "+"
+        speed="paused" if self.speed == 0 else "%gx"%self.speed
+        return "%s%dd %02d:%02d %s"%(sign,days,rest//3600,rest%3600//60,speed)
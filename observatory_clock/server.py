@@ -0,0 +1,211 @@
+#The clock state served to other displays: python -m observatory_clock --serve
+#computes it once a tick and any number of clients (other clocks started with
+#--connect, a browser, a script) read it instead of computing it themselves.
+#    GET /        a plain page showing the clock, fed by /ws
+#    GET /state   the newest ClockState as JSON
+#    GET /events  every new one as it is computed, as Server-Sent Events
+#    GET /ws      the same over a WebSocket
+#Only the standard library is used.  The WebSocket is the part of RFC 6455 a
+#server needs to push text frames and answer ping and close.
+import asyncio
+import base64
+import hashlib
+import json
+from .clockstate import to_json
+
+WS_GUID="258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+QUEUE=2 #states a slow client may fall behind by, older ones are dropped for it
+HEADER_TIMEOUT=10 #seconds a client has to send its request
+MAX_FRAME=1024 #bytes of a frame from a client, which only sends pings and close
+CLOSE_TOO_BIG=1009 #the close code for a frame over MAX_FRAME
+
+PAGE="""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Observatory Clock</title></head>
+<body style="font-family:monospace;font-size:2em">
+<div id="clock">connecting...</div>
+<script>
+function hms(t){return t.slice(0,2).map(function(x){return ("0"+x).slice(-2)}).join(":")+":"+("0"+Math.floor(t[2])).slice(-2);}
+function show(s){
+ document.getElementById("clock").innerHTML=s.sitename+"<br>LOCAL: "+s.local.slice(11,19)+"<br>LST: "+hms(s.last)
+  +"<br>UT: "+s.ut.slice(11,19)+"<br>GST: "+hms(s.gast)+"<br>JD: "+s.jd.toFixed(4)+"<br>MJD: "+s.mjd.toFixed(4)
+  +"<br>Moon Illumination: "+(s.moonphase*100).toFixed(1)+"%";
+}
+function connect(){
+ var ws=new WebSocket((location.protocol=="https:"?"wss://":"ws://")+location.host+"/ws");
+ ws.onmessage=function(e){show(JSON.parse(e.data));};
+ ws.onclose=function(){document.getElementById("clock").innerHTML+="<br>(reconnecting)";setTimeout(connect,5000);};
+}
+connect();
+</script></body></html>
+"""
+
+def ws_frame(payload,opcode=0x1):
+    #one unmasked, unfragmented WebSocket frame, text by default
+    n=len(payload)
+    if n < 126:
+        header=bytes((0x80|opcode,n))
+    elif n < 65536:
+        header=bytes((0x80|opcode,126))+n.to_bytes(2,"big")
+    else:
+        header=bytes((0x80|opcode,127))+n.to_bytes(8,"big")
+    return header+payload
+
+async def ws_read(reader):
+    #the next frame from a client as (opcode, payload), unmasked.  ValueError
+    #for one over MAX_FRAME, before any of it is read.
+    b0,b1=await reader.readexactly(2)
+    n=b1&0x7f
+    if n == 126:
+        n=int.from_bytes(await reader.readexactly(2),"big")
+    elif n == 127:
+        n=int.from_bytes(await reader.readexactly(8),"big")
+    if n > MAX_FRAME:
+        raise ValueError("a %d byte frame, more than %d"%(n,MAX_FRAME))
+    mask=await reader.readexactly(4) if b1&0x80 else bytes(4)
+    payload=await reader.readexactly(n)
+    return b0&0x0f,bytes(b^mask[i%4] for i,b in enumerate(payload))
+
+class ClockServer:
+    #Pushes the newest state of worker (a ClockWorker) to every client.  The
+    #worker calls notify from its thread; the state is turned into JSON once in
+    #the event loop and the same text goes to every client's queue.
+    def __init__(self,worker,host="127.0.0.1",port=8765):
+        self.worker=worker
+        self.host=host
+        self.port=port
+        self.payload=None #the newest state as JSON text
+        self.clients=set() #an asyncio.Queue for each connected /events or /ws client
+        self.loop=None
+
+    def notify(self,state):
+        self.loop.call_soon_threadsafe(self.publish,state)
+
+    def publish(self,state):
+        self.payload=json.dumps(to_json(state))
+        for queue in self.clients:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(self.payload)
+
+    def subscribe(self):
+        queue=asyncio.Queue(QUEUE)
+        if self.payload is not None:
+            queue.put_nowait(self.payload)
+        self.clients.add(queue)
+        return queue
+
+    async def serve(self):
+        self.loop=asyncio.get_running_loop()
+        self.worker.listeners.append(self.notify)
+        if self.worker.latest is not None:
+            self.publish(self.worker.latest)
+        server=await asyncio.start_server(self.handle,self.host,self.port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self,reader,writer):
+        try:
+            method,path,headers=await asyncio.wait_for(self.read_request(reader),HEADER_TIMEOUT)
+            path=path.split("?")[0]
+            if method != "GET":
+                self.respond(writer,"405 Method Not Allowed","text/plain","GET only\n")
+            elif path == "/state":
+                if self.payload is None:
+                    self.respond(writer,"503 Service Unavailable","text/plain","no state yet\n")
+                else:
+                    self.respond(writer,"200 OK","application/json",self.payload)
+            elif path == "/events":
+                await self.events(writer)
+            elif path == "/ws" and headers.get("upgrade","").lower() == "websocket":
+                await self.websocket(reader,writer,headers)
+            elif path == "/":
+                self.respond(writer,"200 OK","text/html; charset=utf-8",PAGE)
+            else:
+                self.respond(writer,"404 Not Found","text/plain","not found\n")
+            await writer.drain()
+        except (ConnectionError,ValueError,asyncio.IncompleteReadError,asyncio.TimeoutError):
+            pass #the client went away or did not speak HTTP
+        finally:
+            writer.close()
+
+    async def read_request(self,reader):
+        #(method, path, headers with lower case names) of an HTTP request
+        method,path,version=(await reader.readline()).decode("latin-1").split()
+        headers={}
+        while True:
+            line=(await reader.readline()).decode("latin-1").strip()
+            if not line:
+                return method,path,headers
+            name,_,value=line.partition(":")
+            headers[name.strip().lower()]=value.strip()
+
+    def respond(self,writer,status,kind,body):
+        body=body.encode("utf-8")
+        writer.write(("HTTP/1.1 %s\r\nContent-Type: %s\r\nContent-Length: %d\r\n"
+                      "Access-Control-Allow-Origin: *\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n"
+                      %(status,kind,len(body))).encode("latin-1")+body)
+
+    async def events(self,writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Access-Control-Allow-Origin: *\r\nCache-Control: no-cache\r\n\r\n")
+        queue=self.subscribe()
+        try:
+            while True:
+                payload=await queue.get()
+                writer.write(b"data: "+payload.encode("utf-8")+b"\n\n")
+                await writer.drain()
+        finally:
+            self.clients.discard(queue)
+
+    async def websocket(self,reader,writer,headers):
+        key=headers.get("sec-websocket-key")
+        if not key:
+            self.respond(writer,"400 Bad Request","text/plain","no Sec-WebSocket-Key\n")
+            return
+        accept=base64.b64encode(hashlib.sha1((key+WS_GUID).encode("latin-1")).digest()).decode("latin-1")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      "Sec-WebSocket-Accept: %s\r\n\r\n"%accept).encode("latin-1"))
+        queue=self.subscribe()
+        listening=asyncio.ensure_future(self.ws_listen(reader,writer))
+        try:
+            while not listening.done():
+                getting=asyncio.ensure_future(queue.get())
+                await asyncio.wait((getting,listening),return_when=asyncio.FIRST_COMPLETED)
+                if getting.done():
+                    writer.write(ws_frame(getting.result().encode("utf-8")))
+                    await writer.drain()
+                else:
+                    getting.cancel()
+        finally:
+            self.clients.discard(queue)
+            if listening.done():
+                listening.exception() #the client closed or dropped, nothing more to do
+            else:
+                listening.cancel()
+
+    async def ws_listen(self,reader,writer):
+        #answer the client's pings and return when it closes, what it sends is not used
+        while True:
+            try:
+                opcode,payload=await ws_read(reader)
+            except ValueError:
+                writer.write(ws_frame(CLOSE_TOO_BIG.to_bytes(2,"big"),0x8))
+                return
+            if opcode == 0x8:
+                writer.write(ws_frame(payload[:2],0x8))
+                return
+            if opcode == 0x9:
+                writer.write(ws_frame(payload,0xA))
+
+def serve(site,host="127.0.0.1",port=8765,refresh=None,sidereal_mode="fast"):
+    #run a ClockWorker for site (a SiteContext) and serve its states until interrupted
+    from .worker import ClockWorker
+    worker=ClockWorker(site,refresh or {},sidereal_mode)
+    worker.start()
+    print("serving the clock for %s on http://%s:%d/"%(site.sitename,host,port))
+    try:
+        asyncio.run(ClockServer(worker,host,port).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
@@ -0,0 +1,41 @@
+import numpy as np
+
+#worst difference, in seconds of time, allowed between fast_sidereal and
+#astropy's apparent sidereal time (IAU 2006/2000A); see validate_sidereal
+SIDEREAL_TOLERANCE=0.05
+
+def fast_sidereal(jd_ut1,longitude=0.0):
+    #Apparent sidereal time in decimal hours straight from the IAU 2006 GMST
+    #polynomial on the Earth rotation angle plus the equation of the equinoxes
+    #from the largest nutation terms.  Works on floats or numpy arrays; the
+    #longitude is in degrees, East positive, 0 gives Greenwich.
+    du=jd_ut1-2451545.0
+    t=du/36525.0 #TT-UT1 is about a minute, far below what matters here
+    era=(0.7790572732640+0.00273781191135448*du+du%1.0)%1.0*360.0
+    gmst=era+(0.014506+4612.156534*t+1.3915817*t**2-0.00000044*t**3
+              -0.000029956*t**4-0.0000000368*t**5)/3600.0
+    omega=np.radians(125.04452-1934.136261*t) #moon's ascending node
+    L=np.radians(280.4665+36000.7698*t) #mean longitude of the sun
+    Lm=np.radians(218.3165+481267.8813*t) #mean longitude of the moon
+    eps=np.radians(23.439291-0.0130042*t) #obliquity of the ecliptic
+    dpsi=-17.20*np.sin(omega)-1.32*np.sin(2*L)-0.23*np.sin(2*Lm)+0.21*np.sin(2*omega)
+    ee=dpsi*np.cos(eps)+0.00264*np.sin(omega)+0.000063*np.sin(2*omega)
+    return ((gmst+ee/3600.0+longitude)/15.0)%24.0
+
+def split_hours(hours):
+    #decimal hours to the (hours,minutes,seconds) tuple the display uses
+    h=int(hours)
+    m=int((hours-h)*60)
+    return (h,m,(hours-h-m/60.)*3600)
+
+def validate_sidereal(n=5000,start="1995-01-01",years=30):
+    #Compare fast_sidereal with astropy's apparent sidereal time over n times
+    #spread through the given years.  Returns the worst difference in seconds of
+    #time and whether it is inside SIDEREAL_TOLERANCE.
+    import astropy.units as u
+    from astropy.time import Time
+    t=Time(start)+np.linspace(0,years*365.25,n)*u.day
+    ref=t.sidereal_time('apparent','greenwich').hour
+    fast=fast_sidereal(t.ut1.jd1+t.ut1.jd2)
+    worst=np.abs(((fast-ref+12)%24-12)*3600).max()
+    return worst,worst <= SIDEREAL_TOLERANCE
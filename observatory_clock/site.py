@@ -0,0 +1,91 @@
+import astropy.units as u
+from astropy.time import Time
+from astropy.coordinates import EarthLocation
+from datetime import datetime,timezone,timedelta,time as dtime
+from collections import OrderedDict
+from suntime import Sun
+from astroplan import Observer
+from .clockstate import RiseSet
+
+#zenith distance of the sun, in degrees, for sunrise/sunset and each twilight
+ZENITH=OrderedDict([("sun",90.8333),("civil",96.0),("nautical",102.0),("astronomical",108.0)])
+
+class RiseSetCache:
+    #Sunrise, sunset and twilight keyed by (latitude, longitude, local date).
+    #The answer only changes once a day or when the site changes, so it is
+    #computed once and then looked up; only the last few keys are kept.
+    def __init__(self,size=4):
+        self.size=size
+        self.cache=OrderedDict()
+
+    def get(self,latf,lonf,date,tzinfo=None):
+        key=(latf,lonf,date,tzinfo)
+        if key not in self.cache:
+            self.cache[key]=self.compute(latf,lonf,date,tzinfo)
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        return self.cache[key]
+
+    def clear(self):
+        self.cache.clear()
+
+    def compute(self,latf,lonf,date,tzinfo=None):
+        sun=Sun(latf,lonf)
+        #the utc offset on that date in tzinfo, by default the computer's, so no
+        #timezone guessing is needed
+        noon=datetime.combine(date,dtime(12))
+        tz=timezone((noon.replace(tzinfo=tzinfo) if tzinfo is not None else noon.astimezone()).utcoffset())
+        midnight=datetime.combine(date,dtime(tzinfo=tz))
+        times={}
+        for name,zenith in ZENITH.items():
+            rise=sun.get_sun_timedelta(midnight,tz,is_rise_time=True,zenith=zenith)
+            set=sun.get_sun_timedelta(midnight,tz,is_rise_time=False,zenith=zenith)
+            if rise is None or set is None:
+                times[name]=None
+            else:
+                #suntime can return times past midnight or before it, keep the time of day
+                times[name]=(midnight+set%timedelta(days=1),midnight+rise%timedelta(days=1))
+        sun_times=times.pop("sun")
+        if sun_times is None:
+            return RiseSet(date,None,None,**times)
+        return RiseSet(date,sun_times[1],sun_times[0],**times)
+
+class SiteContext:
+    #The observatory site and everything derived from it that does not change
+    #from tick to tick.  It is built once when the preferences are loaded or the
+    #site is set, and all of the per-tick calculations go through it.  tz is
+    #the site's timezone name, e.g. "America/New_York"; None uses the
+    #computer's, which then must match the site.
+    def __init__(self,sitename,latf,lonf,elevation=0.0,tz=None):
+        self.sitename=sitename
+        self.latf=latf
+        self.lonf=lonf
+        self.tz=tz
+        self.tzinfo=None
+        if tz:
+            try:
+                from zoneinfo import ZoneInfo
+                self.tzinfo=ZoneInfo(tz)
+            except Exception as err:
+                print("unknown timezone %s for %s, using the computer's: %s"%(tz,sitename,err))
+        self.location=EarthLocation.from_geodetic(lonf*u.deg,latf*u.deg,elevation*u.m)
+        self.observer=Observer(location=self.location,name=sitename)
+        self.sun=RiseSetCache()
+
+    def time(self,t):
+        #an observation time at this site, sidereal time and positions use its location
+        return Time(t,location=self.location)
+
+    def moon_illumination(self,ut):
+        return self.observer.moon_illumination(ut)
+
+    def riseset(self,date):
+        return self.sun.get(self.latf,self.lonf,date,self.tzinfo)
+
+    def local(self,utc):
+        #the site's local time, naive like the rest of the clock, from an aware datetime
+        return utc.astimezone(self.tzinfo).replace(tzinfo=None)
+
+    def local_sidereal(self,gast):
+        #local sidereal time in hours from Greenwich sidereal time in hours
+        return (gast+self.lonf/15.)%24
@@ -0,0 +1,92 @@
+from datetime import datetime,timezone
+from astropy.time import Time
+from .constants import pi12, pi2
+from .sidereal import fast_sidereal, split_hours
+from .ephemeris import Ephemeris
+from .clockstate import ClockState
+
+_ephemeris=None #shared by compute_clock_state when no ephemeris is given
+
+def local_now(tzinfo=None):
+    #the system clock as (astropy Time, naive local datetime in tzinfo, None
+    #for the system timezone)
+    now=datetime.now(timezone.utc)
+    return Time(now),now.astimezone(tzinfo).replace(tzinfo=None)
+
+def local_time(time,tzinfo=None):
+    #any of None (now), a datetime or an astropy Time as (Time, naive local
+    #datetime in tzinfo).  A naive datetime is taken to be in tzinfo, or the
+    #system timezone like the rest of the clock.
+    if time is None:
+        return local_now(tzinfo)
+    if isinstance(time,datetime):
+        if time.tzinfo is None:
+            time=time.replace(tzinfo=tzinfo) if tzinfo is not None else time.astimezone()
+        return Time(time.astimezone(timezone.utc)),time.astimezone(tzinfo).replace(tzinfo=None)
+    t=Time(time)
+    return t,t.to_datetime(timezone=timezone.utc).astimezone(tzinfo).replace(tzinfo=None)
+
+def get_dut1(ut):
+    try:
+        return float(ut.delta_ut1_utc)
+    except Exception:
+        return 0.0 #no IERS table, UTC is within 0.9 s of UT1
+
+def sidereal_split(time):
+    # function to reformat the sidereal time
+    h=str(time).split('h')
+    m=h[1].split('m')
+    s=m[1].split('s')
+    return (int(h[0]),int(m[0]),float(s[0]))
+
+def greenwich_sidereal(ut,mode="fast",dut1=None):
+    #apparent Greenwich sidereal time in decimal hours, shared by every site
+    if mode == "fast":
+        if dut1 is None:
+            dut1=get_dut1(ut)
+        return fast_sidereal(ut.jd1+ut.jd2+dut1/86400.)
+    return ut.sidereal_time('apparent', 'greenwich').hour
+
+def sidereal_times(site,ut,mode="fast",dut1=None):
+    #(GAST, LAST) each as (hours, minutes, seconds).  mode "fast" is the closed
+    #form, anything else is astropy's reference path.  dut1 is UT1-UTC in
+    #seconds, looked up from IERS when not given.
+    if mode == "fast":
+        GAST=greenwich_sidereal(ut,mode,dut1)
+        LAST=site.local_sidereal(GAST)
+        return split_hours(GAST),split_hours(LAST)
+    GAST=ut.sidereal_time('apparent', 'greenwich')
+    LAST=ut.sidereal_time('apparent')
+    return sidereal_split(str(GAST)),sidereal_split(str(LAST))
+
+def get_delta_ST(LAST,local):
+    st=float(LAST[0])+LAST[1]/60.+LAST[2]/3600.
+    l=float(local.hour)+local.minute/60.+local.second/3600.
+    return(l-st)
+
+def make_state(site,ut,local,moonphase,riseset,GAST,LAST,eph):
+    #assemble a ClockState from the computed pieces, the dial angles follow from them
+    ut_hour=float(ut.utc.strftime("%H"))
+    stdelta=get_delta_ST(LAST,local)
+    stangle=float(LAST[0]) + float(LAST[1])/60.#-stdelta+nightlength
+    stangle = stangle * pi12 - pi2 +stdelta* pi12
+    return ClockState(site.sitename,local,ut,ut_hour,ut.jd,ut.mjd,GAST,LAST,stdelta,stangle,
+                      moonphase,riseset,eph)
+
+def compute_clock_state(site,time=None,ephemeris=None,sidereal_mode="fast"):
+    #Everything the clock shows for site (a SiteContext) at one instant, as a
+    #ClockState: LST, GST, JD, MJD, sunrise/sunset and twilight, moon
+    #illumination and the body positions.  No GUI and no caching beyond what
+    #the site and ephemeris keep; time is None for now, a datetime or an
+    #astropy Time.  ephemeris is an Ephemeris or EphemerisTable to use, a
+    #shared Ephemeris by default.
+    global _ephemeris
+    if ephemeris is None:
+        if _ephemeris is None:
+            _ephemeris=Ephemeris()
+        ephemeris=_ephemeris
+    t,local=local_time(time,site.tzinfo)
+    ut=site.time(t)
+    GAST,LAST=sidereal_times(site,ut,sidereal_mode)
+    return make_state(site,ut,local,site.moon_illumination(ut),site.riseset(local.date()),
+                      GAST,LAST,ephemeris.compute(ut))
@@ -0,0 +1,74 @@
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+from collections import namedtuple
+from .sidereal import fast_sidereal
+from .ephemeris import Ephemeris, EphemerisTable
+from .site import ZENITH
+
+#Columnar clock quantities for many times and sites.  Times are the columns:
+#    time, jd, mjd, gast (hours), moonphase      shape (times,)
+#    last (hours), sun_alt (degrees), night, dark shape (sites,times)
+#    eph                                          one BodyPositions per site,
+#                                                 arrays indexed [body,time]
+#night is the sun below the horizon (as for sunrise/sunset) and dark is the
+#sun below astronomical twilight.
+Sweep=namedtuple("Sweep",["sitenames","time","jd","mjd","gast","last","moonphase",
+    "eph","sun_alt","night","dark"])
+
+def time_range(start,stop,step=1*u.min):
+    #an array valued Time from start up to stop every step, in UTC
+    start=Time(start)
+    n=int(np.floor(((Time(stop)-start)/step).decompose()))+1
+    return start+np.arange(n)*step
+
+def sun_altitude(latf,ra,dec,last):
+    #altitude in degrees from ra/dec in degrees and local sidereal time in hours
+    lat=np.radians(latf)
+    dec=np.radians(dec)
+    ha=np.radians(last*15.-ra)
+    return np.degrees(np.arcsin(np.sin(lat)*np.sin(dec)+np.cos(lat)*np.cos(dec)*np.cos(ha)))
+
+def moon_illumination(eph):
+    #fraction of the moon lit from BodyPositions holding the sun and moon, the
+    #same phase angle formula astroplan uses, for every time at once
+    ra_s,dec_s,r_s=(np.radians(eph["sun"][0]),np.radians(eph["sun"][1]),eph["sun"][2])
+    ra_m,dec_m,r_m=(np.radians(eph["moon"][0]),np.radians(eph["moon"][1]),eph["moon"][2])
+    elong=np.arccos(np.clip(np.sin(dec_s)*np.sin(dec_m)+np.cos(dec_s)*np.cos(dec_m)*np.cos(ra_s-ra_m),-1,1))
+    i=np.arctan2(r_s*np.sin(elong),r_m-r_s*np.cos(elong))
+    return (1+np.cos(i))/2.0
+
+def sweep_bodies(location,t,ephemeris,step):
+    #body positions at every time in t.  A long sweep is interpolated from an
+    #EphemerisTable every step, which is far cheaper than the direct calculation
+    #at every time; the table's max_error is its worst error.
+    if t.size < 3 or t.max()-t.min() < 2*step:
+        return ephemeris.compute(Time(t,location=location))
+    table=EphemerisTable(ephemeris,step,(t.max()-t.min()).to(u.min)+step)
+    table.build(t.min(),location)
+    return table.interpolate(t)
+
+def sweep(sites,times,ephemeris=None,step=30*u.min):
+    #The clock for every time in times (an array valued Time, or anything Time
+    #accepts, in UTC) at one SiteContext or a list of them, as a Sweep.  Each
+    #quantity is computed for all of the times at once; only the body positions
+    #are done site by site, since they are topocentric.  step is the grid the
+    #body positions are interpolated from, see sweep_bodies.
+    if not isinstance(sites,(list,tuple)):
+        sites=[sites]
+    if ephemeris is None:
+        ephemeris=Ephemeris()
+    t=Time(times)
+    try:
+        ut1=t.ut1
+        jd=ut1.jd1+ut1.jd2
+    except Exception:
+        jd=t.jd1+t.jd2 #no IERS table, UTC is within 0.9 s of UT1
+    gast=fast_sidereal(jd)
+    last=np.array([site.local_sidereal(gast) for site in sites])
+    #geocentric like the clock's moon illumination, the same for every site
+    moonphase=moon_illumination(sweep_bodies(None,t,Ephemeris(("moon","sun"),ephemeris.ephemeris),step))
+    eph=[sweep_bodies(site.location,t,ephemeris,step) for site in sites]
+    sun_alt=np.array([sun_altitude(site.latf,e["sun"][0],e["sun"][1],l) for site,e,l in zip(sites,eph,last)])
+    return Sweep([site.sitename for site in sites],t,t.jd,t.mjd,gast,last,moonphase,eph,
+                 sun_alt,sun_alt < 90-ZENITH["sun"],sun_alt < 90-ZENITH["astronomical"])
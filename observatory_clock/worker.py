@@ -0,0 +1,210 @@
+import threading
+from time import monotonic, time
+from datetime import datetime,timezone
+import astropy.units as u
+from astropy.time import Time
+from .sidereal import split_hours
+from .ephemeris import Ephemeris, EphemerisTable
+from .state import make_state, sidereal_times, greenwich_sidereal, get_dut1, local_time
+from . import data
+from .metrics import Metrics
+from .animate import UNIX_JD
+
+#How often, in seconds, each quantity is recomputed.  The worker ticks at the
+#smallest of these; everything else is served from its cache in between.
+REFRESH={
+    "sidereal":1, #LST/GST, shown to the second
+    "dut1":86400, #UT1-UTC for the fast sidereal time
+    "bodies":20, #sun, moon and planet positions
+    "moon":600, #moon illumination
+    }
+
+class Cached:
+    #a value with its own refresh interval.  It is recomputed when it is older
+    #than interval seconds or when key (the site, the date...) changes.
+    def __init__(self,interval,func):
+        self.interval=interval
+        self.func=func
+        self.value=None
+        self.key=None
+        self.stamp=None
+
+    def get(self,now,key,*args):
+        if self.stamp is None or now-self.stamp >= self.interval or key != self.key:
+            self.value=self.func(*args)
+            self.key=key
+            self.stamp=now
+        return self.value
+
+    def expire(self):
+        self.stamp=None
+
+class ClockWorker:
+    #Does all of the astronomy for the clock in a background thread, every
+    #tick or straight away when refresh() is called.  Each quantity is only
+    #recomputed at its own rate from REFRESH.  The newest ClockState is kept in
+    #self.latest; replacing the reference is atomic so the GUI can read it at
+    #any time without locking.  clock, a function giving unix seconds, stands
+    #in for the system clock, the soak benchmark runs through days with it.
+    def __init__(self,site,refresh=REFRESH,sidereal_mode="fast",metrics=None,clock=None):
+        data.use_cache() #no downloads once the clock is ticking
+        refresh=dict(REFRESH,**refresh) #the preferences may only change some
+        self.site=site #SiteContext
+        self.metrics=metrics or Metrics()
+        self.sidereal_mode=sidereal_mode #"fast" or "astropy", the reference path
+        self.interval=min(refresh.values())
+        self.sidereal=Cached(refresh["sidereal"],self.get_sidereal)
+        self.dut1=Cached(refresh["dut1"],get_dut1)
+        self.bodies=Cached(refresh["bodies"],self.get_bodies)
+        self.moon=Cached(refresh["moon"],self.get_moonphase)
+        self.ephemeris=Ephemeris()
+        self.ephtable=EphemerisTable(self.ephemeris)
+        self.ephtable.verbose=True #the clock's own nightly builds are worth a line
+        self.latest=None
+        self.listeners=[] #called with each new state, in the worker thread
+        self.clock=clock
+        self.until=None #seconds from a state until the next is needed, None for every interval, see lowpower.py
+        self.due=None #unix time of the next state
+        self.wake=threading.Event()
+        self.stopped=False
+        self.thread=None
+
+    def start(self):
+        self.thread=threading.Thread(target=self.run,daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped=True
+        self.wake.set()
+
+    def refresh(self):
+        #compute a new state now rather than waiting for the next interval,
+        #every cached quantity is recomputed too.
+        for cache in (self.sidereal,self.dut1,self.bodies,self.moon):
+            cache.expire()
+        self.site.sun.clear()
+        self.due=None #now, whatever the low power wait was
+        self.wake.set()
+
+    def set_site(self,site):
+        self.site=site
+        self.refresh()
+
+    def set_refresh(self,refresh):
+        #new refresh intervals, only the ones given change
+        refresh=dict(REFRESH,**refresh)
+        for key in REFRESH:
+            getattr(self,key).interval=refresh[key]
+        self.interval=min(refresh.values())
+        self.wake.set()
+
+    def run(self):
+        target=None
+        while not self.stopped:
+            self.wake.clear()
+            self.metrics.tick(target)
+            try:
+                self.latest=self.compute()
+                for listener in self.listeners:
+                    listener(self.latest)
+            except Exception as err:
+                print("clock update failed: %s"%err)
+            #sleep until the next whole interval of the wall clock rather than
+            #for interval, so the compute time does not add up as drift
+            now=time()
+            target=now-now%self.interval+self.interval
+            if self.until is not None and self.latest is not None:
+                try:
+                    target=max(target,(self.latest.jd-UNIX_JD)*86400+self.until(self.latest))
+                except Exception as err:
+                    print("failed to work out the next change: %s"%err)
+            self.due=target
+            if self.wake.wait(target-now):
+                target=None #woken early by refresh()
+
+    def now(self):
+        #(seconds the refresh intervals are counted in, aware UTC datetime)
+        if self.clock is None:
+            return monotonic(),datetime.now(timezone.utc)
+        now=self.clock()
+        return now,datetime.fromtimestamp(now,timezone.utc)
+
+    def compute(self):
+        #gnerate all the times based off the system clock and system timzeone.
+        lap=self.metrics.lap()
+        now,utc=self.now()
+        site=self.site
+        t,local=local_time(utc,site.tzinfo)
+        ut=site.time(t)
+        lap("time")
+        moonphase=self.moon.get(now,site,site,ut)
+        lap("moon")
+        riseset=site.riseset(local.date())
+        lap("riseset")
+        GAST,LAST=self.sidereal.get(now,(site,self.sidereal_mode),site,ut,now)
+        lap("sidereal")
+        eph=self.bodies.get(now,site,ut)
+        lap("bodies")
+        state=make_state(site,ut,local,moonphase,riseset,GAST,LAST,eph)
+        lap("state")
+        return state
+
+    def get_moonphase(self,site,ut):
+        return site.moon_illumination(ut)
+
+    def get_sidereal(self,site,ut,now):
+        dut1=self.dut1.get(now,None,ut) if self.sidereal_mode == "fast" else None
+        return sidereal_times(site,ut,self.sidereal_mode,dut1)
+
+    def get_bodies(self,ut):
+        #Get ephemeris for solar system objects, interpolated from the nightly
+        #table when it covers now, otherwise all bodies in one direct pass.
+        if not self.ephtable.covers(ut,margin=12*u.hour):
+            self.ephtable.build_background(ut-6*u.hour,ut.location)
+        return self.ephtable.compute(ut)
+
+class DashboardWorker(ClockWorker):
+    #ClockWorker for several sites at once.  Everything that does not depend on
+    #the site, GST, JD, the moon illumination and the body positions (geocentric
+    #here, the moon's parallax is too small to see on the dial), is computed once
+    #per tick and shared.  Only the local time, LST and rise/set are per site.
+    #latest is a tuple with a ClockState for each site.
+    def __init__(self,sites,refresh=REFRESH,sidereal_mode="fast",metrics=None,clock=None):
+        ClockWorker.__init__(self,sites[0],refresh,sidereal_mode,metrics,clock)
+        self.sites=list(sites)
+        self.sidereal=Cached(self.sidereal.interval,self.get_gast)
+
+    def refresh(self):
+        for site in self.sites:
+            site.sun.clear()
+        ClockWorker.refresh(self)
+
+    def set_sites(self,sites):
+        self.sites=list(sites)
+        self.site=self.sites[0]
+        self.refresh()
+
+    def compute(self):
+        lap=self.metrics.lap()
+        now,utc=self.now()
+        ut=Time(utc)
+        lap("time")
+        moonphase=self.moon.get(now,None,self.sites[0],ut)
+        lap("moon")
+        gast=self.sidereal.get(now,self.sidereal_mode,ut,now)
+        GAST=split_hours(gast)
+        lap("sidereal")
+        eph=self.bodies.get(now,None,ut)
+        lap("bodies")
+        states=[]
+        for site in self.sites:
+            local=site.local(utc)
+            states.append(make_state(site,ut,local,moonphase,site.riseset(local.date()),
+                                     GAST,split_hours(site.local_sidereal(gast)),eph))
+        lap("sites")
+        return tuple(states)
+
+    def get_gast(self,ut,now):
+        dut1=self.dut1.get(now,None,ut) if self.sidereal_mode == "fast" else None
+        return greenwich_sidereal(ut,self.sidereal_mode,dut1)
+